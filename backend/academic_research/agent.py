@@ -17,6 +17,8 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
 
+from .util.models import routed_model
+from .util.paper_store import ensure_paper_store
 from .util.prompts import load_prompt
 from .sub_agents.literature_synthesizer import literature_synthesizer_agent
 from .sub_agents.paper_critic import paper_critic_agent
@@ -24,8 +26,6 @@ from .sub_agents.research_idea import research_idea_agent
 from .sub_agents.trend_survey import trend_survey_agent
 from .sub_agents.paper_search import paper_search_agent
 
-MODEL = "gemini-2.5-flash"
-
 
 class CoordinatorAgent(LlmAgent):
     """Root coordinator agent defined in this module so ADK Runner infers app name from academic_research.agent, avoiding 'App name mismatch' warning."""
@@ -35,9 +35,10 @@ class CoordinatorAgent(LlmAgent):
 
 coordinator = CoordinatorAgent(
     name="coordinator",
-    model=MODEL,
+    model=routed_model("coordinator"),
     description=load_prompt("coordinator/description"),
     instruction=load_prompt("coordinator/instruction"),
+    before_agent_callback=ensure_paper_store,
     tools=[
         AgentTool(agent=paper_search_agent),
         AgentTool(agent=trend_survey_agent),
@@ -14,5 +14,14 @@
 
 """Literature synthesizer agent for synthesizing literature into structured summaries."""
 
-# pylint: disable=unused-import
-from .agent import literature_synthesizer_agent
+from typing import Any
+
+__all__ = ["literature_synthesizer_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "literature_synthesizer_agent":
+        from .agent import literature_synthesizer_agent
+
+        return literature_synthesizer_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -16,11 +16,12 @@
 
 from google.adk import Agent
 
+from academic_research.util.models import routed_model
 from academic_research.util.prompts import load_prompt
 
-from academic_research.util.tools import fetch_url
-
-MODEL = "gemini-2.5-flash"
+from academic_research.sub_agents.literature_synthesizer.tools import synthesize_in_batches
+from academic_research.sub_agents.paper_search.tools import get_paper_details
+from academic_research.util.tools import fetch_url, fetch_urls
 
 
 class LiteratureSynthesizerAgent(Agent):
@@ -29,9 +30,9 @@ class LiteratureSynthesizerAgent(Agent):
 
 
 literature_synthesizer_agent = LiteratureSynthesizerAgent(
-    model=MODEL,
+    model=routed_model("literature_synthesizer"),
     name="literature_synthesizer_agent",
     description=load_prompt("literature_synthesizer/description"),
     instruction=load_prompt("literature_synthesizer/instruction"),
-    tools=[fetch_url],
+    tools=[fetch_url, fetch_urls, get_paper_details, synthesize_in_batches],
 )
@@ -0,0 +1,365 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Map-reduce synthesis for paper sets too large for one model call.
+
+synthesize_in_batches splits the papers into batches, summarizes the batches
+concurrently (map) and merges the partial syntheses a few at a time, level by
+level, until one is left (reduce). Every model call sees a bounded input, so
+none overflows the context or turns into a slow long-context generation, and
+with enough parallelism the wall-clock time grows with the number of merge
+levels (logarithmic in the number of papers) rather than with the papers.
+Per-paper comparison rows are taken from the map outputs as they are instead
+of being rewritten by every merge. The tool result carries only the first
+rows of the comparison table, so the agent's final answer does not grow with
+the number of papers; the full table is streamed to the client in the tool's
+final progress event instead (a CUSTOM event, not session state, which is
+copied into every sub-session).
+
+Environment:
+    SYNTHESIS_BATCH_SIZE: Papers per map call (default 8).
+    SYNTHESIS_MERGE_FANOUT: Partial syntheses merged per reduce call (default 4).
+    SYNTHESIS_CONCURRENCY: Model calls in flight at once per synthesis (default 16).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import re
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from academic_research.sub_agents.paper_search.tools import get_paper_details
+from academic_research.util import cancellation
+from academic_research.util.models import routed_model
+from academic_research.util.paper_store import StateContext, paper_stores
+from academic_research.util.progress import ProgressReporter
+from academic_research.util.prompts import load_prompt
+
+_BATCH_SIZE = int(os.getenv("SYNTHESIS_BATCH_SIZE", "8"))
+_MERGE_FANOUT = int(os.getenv("SYNTHESIS_MERGE_FANOUT", "4"))
+_CONCURRENCY = int(os.getenv("SYNTHESIS_CONCURRENCY", "16"))
+_MAX_PAPERS = 500
+# Abstracts are cut to this many characters in the map prompts.
+_MAX_ABSTRACT_CHARS = 1500
+_MAX_AUTHORS = 3
+
+_TABLE_HEADER = (
+    "| Paper | Year | Method | Dataset | Main Finding | Limitations |\n"
+    "|---|---|---|---|---|---|"
+)
+_ROWS_HEADING_RE = re.compile(r"^[#*\s\"]*comparison rows", re.IGNORECASE)
+# The map prompt asks for the paper's source number first in the Paper cell.
+_ROW_NUMBER_RE = re.compile(r"^\|\s*\[(\d+)\]\s*")
+# Rows of the comparison table returned to the agent, which repeats them in its answer.
+_RETURNED_TABLE_ROWS = 20
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class MapReduceResult:
+    """Outcome of map_reduce: the final output and how it was produced."""
+
+    output: str
+    batches: int
+    levels: int = 0
+    calls: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+async def map_reduce(
+    items: Sequence[_T],
+    map_fn: Callable[[_T], Awaitable[str]],
+    reduce_fn: Callable[[list[str]], Awaitable[str]],
+    *,
+    fanout: int = _MERGE_FANOUT,
+    concurrency: int = _CONCURRENCY,
+    progress: Callable[..., None] | None = None,
+) -> MapReduceResult:
+    """Map every item to a text, then merge the texts fanout at a time until one is left.
+
+    All calls share one concurrency limit. A failed map call drops its item
+    (recorded in errors); a failed merge passes its inputs on unmerged.
+
+    Args:
+        items: Inputs of the map step, e.g. batches of papers.
+        map_fn: Produces a partial result for one item.
+        reduce_fn: Merges several partial results into one.
+        fanout: Partial results per merge call (at least 2).
+        concurrency: Map and merge calls running at once.
+        progress: Optional ProgressReporter-style callable (message, **data).
+
+    Returns:
+        A MapReduceResult; raises RuntimeError if every map call failed.
+    """
+    fanout = max(2, fanout)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    result = MapReduceResult(output="", batches=len(items))
+    mapped = 0
+
+    async def run_map(item: _T) -> str:
+        nonlocal mapped
+        async with semaphore:
+            cancellation.checkpoint()
+            result.calls += 1
+            try:
+                return await map_fn(item)
+            finally:
+                mapped += 1
+                if progress is not None:
+                    progress(
+                        f"Summarized {mapped} of {len(items)} batches",
+                        stage="map",
+                        finished=mapped,
+                        total=len(items),
+                    )
+
+    async def run_reduce(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        async with semaphore:
+            cancellation.checkpoint()
+            result.calls += 1
+            return await reduce_fn(group)
+
+    outcomes = await asyncio.gather(*(run_map(item) for item in items), return_exceptions=True)
+    partials: list[str] = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, cancellation.RunCancelled):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            result.errors.append(f"batch {index + 1}: {type(outcome).__name__}: {outcome}")
+        elif outcome:
+            partials.append(outcome)
+    if not partials:
+        raise RuntimeError(f"All {len(items)} batches failed: {'; '.join(result.errors)}")
+
+    while len(partials) > 1:
+        result.levels += 1
+        groups = [partials[i : i + fanout] for i in range(0, len(partials), fanout)]
+        if progress is not None:
+            progress(
+                f"Merging {len(partials)} partial syntheses into {len(groups)}",
+                stage="reduce",
+                level=result.levels,
+                inputs=len(partials),
+            )
+        outcomes = await asyncio.gather(
+            *(run_reduce(group) for group in groups), return_exceptions=True
+        )
+        partials = []
+        for group, outcome in zip(groups, outcomes):
+            if isinstance(outcome, cancellation.RunCancelled):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                result.errors.append(
+                    f"merge level {result.levels}: {type(outcome).__name__}: {outcome}"
+                )
+                partials.append("\n\n".join(group))
+            else:
+                partials.append(outcome)
+    result.output = partials[0]
+    return result
+
+
+async def _generate(agent: str, prompt: str) -> str:
+    """One model call with the agent's prompt file as system instruction, through its router."""
+    request = LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+        config=types.GenerateContentConfig(system_instruction=load_prompt(f"{agent}/instruction")),
+    )
+    texts: list[str] = []
+    async for response in routed_model(agent).generate_content_async(request):
+        if response.content is not None:
+            texts.extend(p.text for p in response.content.parts or [] if p.text and not p.thought)
+    return "".join(texts).strip()
+
+
+def _format_paper(number: int, paper: dict[str, Any]) -> str:
+    """One paper as a numbered source block for the map prompt."""
+    authors = [
+        a.get("name", "") if isinstance(a, dict) else str(a) for a in paper.get("authors") or []
+    ]
+    if len(authors) > _MAX_AUTHORS:
+        authors = [*authors[:_MAX_AUTHORS], "et al."]
+    meta = ", ".join(
+        str(v)
+        for v in (paper.get("year"), paper.get("venue"), "; ".join(authors))
+        if v not in (None, "")
+    )
+    title = paper.get("title") or paper.get("paperId")
+    lines = [f"[{number}] {title}" + (f" ({meta})" if meta else "")]
+    if paper.get("citationCount") is not None:
+        lines.append(f"Citations: {paper['citationCount']}")
+    abstract = (paper.get("abstract") or "").strip()
+    if len(abstract) > _MAX_ABSTRACT_CHARS:
+        abstract = abstract[:_MAX_ABSTRACT_CHARS].rstrip() + "..."
+    lines.append(f"Abstract: {abstract or 'n/a'}")
+    return "\n".join(lines)
+
+
+def split_batches(sources: Sequence[_T], batch_size: int = _BATCH_SIZE) -> list[list[_T]]:
+    """Contiguous batches of at most batch_size, as evenly sized as possible."""
+    if not sources:
+        return []
+    count = math.ceil(len(sources) / max(1, batch_size))
+    size = math.ceil(len(sources) / count)
+    return [list(sources[i : i + size]) for i in range(0, len(sources), size)]
+
+
+def _split_rows(text: str) -> tuple[list[str], str]:
+    """Separate markdown table rows (minus header and rule rows) from the rest of a map output."""
+    rows: list[str] = []
+    rest: list[str] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            first_cell = stripped.strip("|").split("|")[0].strip().lower()
+            if first_cell not in ("", "paper") and not set(stripped) <= set("|-: "):
+                rows.append(stripped)
+            continue
+        if not _ROWS_HEADING_RE.match(stripped):
+            rest.append(line)
+    return rows, "\n".join(rest).strip()
+
+
+def _order_rows(rows: list[str]) -> list[str]:
+    """Sort rows by the source number leading their Paper cell, then drop the number.
+
+    Rows without a number (the model ignored the format) keep their relative
+    order after the numbered ones.
+    """
+
+    def key(row: str) -> tuple[bool, int]:
+        match = _ROW_NUMBER_RE.match(row)
+        return (False, int(match.group(1))) if match else (True, 0)
+
+    return [_ROW_NUMBER_RE.sub("| ", row, count=1) for row in sorted(rows, key=key)]
+
+
+def comparison_table(rows: list[str], limit: int | None = None) -> str:
+    """Markdown comparison table with the first limit rows (all when None)."""
+    return "\n".join([_TABLE_HEADER, *rows[:limit]])
+
+
+def _focus_line(focus: str) -> str:
+    return f"Research focus: {focus.strip() or 'not specified'}"
+
+
+async def synthesize_in_batches(
+    paper_ids: list[str],
+    focus: str = "",
+    max_papers: int = 200,
+    tool_context: StateContext | None = None,
+) -> str:
+    """Synthesize a large set of papers by summarizing batches in parallel and merging them.
+
+    Use this instead of writing the synthesis in one answer when there are
+    more than about 80 papers: batches of papers are summarized concurrently
+    and the partial syntheses are merged step by step, which stays fast and
+    within context for hundreds of papers. Full abstracts are looked up
+    automatically.
+
+    Args:
+        paper_ids: Semantic Scholar paperIds of the papers to synthesize. Pass an
+            empty list to use the papers found in this session, most recent first.
+        focus: The topic or question the synthesis should address.
+        max_papers: Maximum number of papers to include. Default 200, max 500.
+
+    Returns:
+        JSON string with synthesis (markdown under "Thematic Clusters", "Key
+        Findings" and "Gaps"), comparison_table (markdown table with the first
+        20 papers' rows), comparison_rows (rows in the full table, which is
+        sent to the client separately), the counts papers, batches and
+        merge_levels, plus missing (unresolved ids) and errors (failed
+        batches) when there are any.
+    """
+    limit = min(max(1, max_papers), _MAX_PAPERS)
+    store = paper_stores.for_context(tool_context)
+    ids = list(dict.fromkeys(paper_ids))
+    if not ids and store is not None:
+        ids = [p["paperId"] for p in store.recent(limit)]
+    ids = ids[:limit]
+    if not ids:
+        return json.dumps(
+            {"error": "No papers to synthesize: pass paper_ids or search for papers first."}
+        )
+
+    details = json.loads(
+        await get_paper_details(ids, fields="title,abstract", tool_context=tool_context)
+    )
+    papers = [
+        (store.get(p["paperId"]) if store is not None else None) or p for p in details["papers"]
+    ]
+    if not papers:
+        return json.dumps({"error": "None of the papers could be resolved.", **details})
+
+    progress = ProgressReporter("synthesize_in_batches", tool_context)
+    batches = split_batches([_format_paper(n, p) for n, p in enumerate(papers, 1)])
+    progress(
+        f"Synthesizing {len(papers)} papers in {len(batches)} batches",
+        papers=len(papers),
+        batches=len(batches),
+    )
+    rows: list[str] = []
+
+    async def summarize(batch: list[str]) -> str:
+        text = await _generate(
+            "synthesis_map", f"{_focus_line(focus)}\n\nPapers:\n\n" + "\n\n".join(batch)
+        )
+        batch_rows, partial = _split_rows(text)
+        rows.extend(batch_rows)
+        return partial
+
+    async def merge(partials: list[str]) -> str:
+        numbered = "\n\n".join(
+            f"Partial synthesis {i}:\n\n{text}" for i, text in enumerate(partials, 1)
+        )
+        return await _generate("synthesis_reduce", f"{_focus_line(focus)}\n\n{numbered}")
+
+    try:
+        outcome = await map_reduce(batches, summarize, merge, progress=progress)
+    except RuntimeError as e:
+        return json.dumps({"error": str(e)})
+
+    # Rows arrive in batch completion order; restore paper order by source number.
+    rows = _order_rows(rows)
+    result: dict[str, Any] = {
+        "synthesis": outcome.output,
+        "comparison_table": comparison_table(rows, _RETURNED_TABLE_ROWS),
+        "comparison_rows": len(rows),
+        "papers": len(papers),
+        "batches": outcome.batches,
+        "merge_levels": outcome.levels,
+    }
+    if details.get("missing"):
+        result["missing"] = details["missing"]
+    if outcome.errors:
+        result["errors"] = outcome.errors
+    progress(
+        f"Synthesized {len(papers)} papers with {outcome.calls} model calls",
+        done=True,
+        calls=outcome.calls,
+        merge_levels=outcome.levels,
+        comparison_table=comparison_table(rows),
+    )
+    return json.dumps(result, ensure_ascii=False)
@@ -14,5 +14,14 @@
 
 """Paper critic agent for methodology and experiment critique."""
 
-# pylint: disable=unused-import
-from .agent import paper_critic_agent
+from typing import Any
+
+__all__ = ["paper_critic_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "paper_critic_agent":
+        from .agent import paper_critic_agent
+
+        return paper_critic_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
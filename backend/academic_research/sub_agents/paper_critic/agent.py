@@ -16,11 +16,11 @@
 
 from google.adk import Agent
 
+from academic_research.util.models import routed_model
 from academic_research.util.prompts import load_prompt
 
-from academic_research.util.tools import fetch_url
-
-MODEL = "gemini-2.5-flash"
+from academic_research.sub_agents.paper_search.tools import get_paper_details
+from academic_research.util.tools import fetch_url, fetch_urls
 
 
 class PaperCriticAgent(Agent):
@@ -29,9 +29,9 @@ class PaperCriticAgent(Agent):
 
 
 paper_critic_agent = PaperCriticAgent(
-    model=MODEL,
+    model=routed_model("paper_critic"),
     name="paper_critic_agent",
     description=load_prompt("paper_critic/description"),
     instruction=load_prompt("paper_critic/instruction"),
-    tools=[fetch_url],
+    tools=[fetch_url, fetch_urls, get_paper_details],
 )
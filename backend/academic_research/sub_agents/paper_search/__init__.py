@@ -14,5 +14,15 @@
 
 """Paper search agent for finding research papers using search tools."""
 
-# pylint: disable=unused-import
-from .agent import paper_search_agent
+from typing import Any
+
+__all__ = ["paper_search_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Lazy so trend_survey can import .tools without building this agent.
+    if name == "paper_search_agent":
+        from .agent import paper_search_agent
+
+        return paper_search_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
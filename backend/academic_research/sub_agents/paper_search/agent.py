@@ -16,12 +16,11 @@
 
 from google.adk import Agent
 
+from academic_research.util.models import routed_model
 from academic_research.util.prompts import load_prompt
 
 from . import tools as paper_search_tools
 
-MODEL = "gemini-2.5-flash"
-
 
 class PaperSearchAgent(Agent):
     """Subclass so ADK infers app name from our module, not google.adk.agents."""
@@ -29,10 +28,13 @@ class PaperSearchAgent(Agent):
 
 
 paper_search_agent = PaperSearchAgent(
-    model=MODEL,
+    model=routed_model("paper_search"),
     name="paper_search_agent",
     description=load_prompt("paper_search/description"),
     instruction=load_prompt("paper_search/instruction"),
-    output_key="recent_citing_papers",
-    tools=[paper_search_tools.semanticscholar_search_bulk],
+    tools=[
+        paper_search_tools.semanticscholar_search_bulk,
+        paper_search_tools.get_paper_details,
+        paper_search_tools.expand_citation_graph,
+    ],
 )
@@ -16,16 +16,151 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from collections.abc import Callable
+from functools import cache, partial
+from typing import Any
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode
 
+from academic_research.util import cancellation
+from academic_research.util.http_client import RateLimiter, http_pool
+from academic_research.util.paper_store import (
+    PAPER_STORE_STATE_KEY,
+    StateContext,
+    paper_stores,
+    remember_papers,
+    summarize_paper,
+)
+from academic_research.util.progress import ProgressReporter
+from academic_research.util.tools import prefetcher
 
-SEMANTIC_SCHOLAR_API = "https://api.semanticscholar.org/graph/v1/paper/search/bulk"
+SEMANTIC_SCHOLAR_GRAPH = "https://api.semanticscholar.org/graph/v1"
+SEMANTIC_SCHOLAR_API = f"{SEMANTIC_SCHOLAR_GRAPH}/paper/search/bulk"
 
+# Fields fetched when resolving papers that are not in the session store yet.
+_DETAIL_FIELDS = (
+    "title,url,abstract,venue,year,authors,citationCount,referenceCount,"
+    "externalIds,openAccessPdf"
+)
+_GRAPH_FIELDS = "title,url,venue,year,citationCount"
+_BATCH_MAX_IDS = 500  # Limit of the /paper/batch endpoint.
+_GRAPH_CONCURRENCY = 4
+_MAX_GRAPH_DEPTH = 3
+_MAX_GRAPH_PAPERS = 1000
+# Papers per level whose neighbours are expanded further (most cited first).
+_MAX_EXPAND_PER_LEVEL = 25
+_RATE_LIMIT_RETRIES = 3
 
-def semanticscholar_search_bulk(
+
+@cache
+def s2_rate_limiter() -> RateLimiter:
+    """Request budget shared by all Semantic Scholar calls in this process.
+
+    SEMANTIC_SCHOLAR_MAX_RPS defaults to 1 request/second (a standard key's
+    quota) with SEMANTIC_SCHOLAR_API_KEY set, and to no limit without a key:
+    unauthenticated calls draw on a shared public pool, where spacing our own
+    requests only adds latency and HTTP 429 responses are retried anyway.
+    Created on first use, after main.py has loaded .env.
+    """
+    default = "1" if os.environ.get("SEMANTIC_SCHOLAR_API_KEY") else "0"
+    return RateLimiter(float(os.getenv("SEMANTIC_SCHOLAR_MAX_RPS", default)))
+
+
+def _s2_request(method: str, url: str, *, body: Any = None, timeout: float = 30) -> Any:
+    """Call the Semantic Scholar API under the shared rate limit; retries on HTTP 429."""
+    headers: dict[str, str] = {"Accept": "application/json"}
+    api_key = os.environ.get("SEMANTIC_SCHOLAR_API_KEY")
+    if api_key:
+        headers["x-api-key"] = api_key
+    payload = None
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+        payload = json.dumps(body).encode()
+
+    for attempt in range(_RATE_LIMIT_RETRIES + 1):
+        cancellation.checkpoint()
+        s2_rate_limiter().acquire()
+        try:
+            resp = http_pool.request(
+                method,
+                url,
+                headers=headers,
+                body=payload,
+                timeout=cancellation.tool_timeout(timeout),
+            )
+            return json.loads(resp.body.decode())
+        except HTTPError as e:
+            if e.code != 429 or attempt == _RATE_LIMIT_RETRIES:
+                raise
+            retry_after = e.headers.get("Retry-After") if e.headers else None
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2**attempt
+            cancellation.sleep(min(delay, 30))
+    raise AssertionError("unreachable")
+
+
+async def _gather_limited(
+    calls: list[Callable[[], Any]],
+    limit: int,
+    on_done: Callable[[int], None] | None = None,
+) -> list[Any]:
+    """Run blocking calls in worker threads, at most ``limit`` at a time.
+
+    Exceptions are returned in place of results. on_done, if given, is called
+    with the number of finished calls after each one completes.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    finished = 0
+
+    async def run(call: Callable[[], Any]) -> Any:
+        nonlocal finished
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(call)
+            finally:
+                finished += 1
+                if on_done is not None:
+                    on_done(finished)
+
+    return await asyncio.gather(*(run(c) for c in calls), return_exceptions=True)
+
+
+def _fetch_batch(paper_ids: list[str], fields: str) -> list[dict[str, Any] | None]:
+    """Fetch up to _BATCH_MAX_IDS papers in one request.
+
+    Returns one entry per requested id, in order; None for unknown ids.
+    """
+    url = f"{SEMANTIC_SCHOLAR_GRAPH}/paper/batch?{urlencode({'fields': fields})}"
+    data = _s2_request("POST", url, body={"ids": paper_ids}) or []
+    return [p if isinstance(p, dict) and p.get("paperId") else None for p in data]
+
+
+def _fetch_neighbours(
+    paper_id: str, relation: str, limit: int, fields: str
+) -> list[dict[str, Any]]:
+    """Papers citing (relation="citations") or cited by ("references") a paper."""
+    key = "citingPaper" if relation == "citations" else "citedPaper"
+    params = urlencode({"fields": fields, "limit": limit})
+    url = f"{SEMANTIC_SCHOLAR_GRAPH}/paper/{quote(paper_id, safe=':/')}/{relation}?{params}"
+    data = _s2_request("GET", url)
+    return [
+        item[key]
+        for item in data.get("data") or []
+        if isinstance(item.get(key), dict) and item[key].get("paperId")
+    ]
+
+
+def _paper_refs(papers: list[dict[str, Any]], limit: int = 20) -> list[dict[str, Any]]:
+    """Minimal partial results for progress updates."""
+    return [
+        {"paperId": p.get("paperId"), "title": p.get("title"), "year": p.get("year")}
+        for p in papers[:limit]
+    ]
+
+
+async def semanticscholar_search_bulk(
     query: str,
     limit: int = 20,
     fields: str = "title,url,abstract,venue,year",
@@ -36,6 +171,7 @@ def semanticscholar_search_bulk(
     open_access_pdf: bool = False,
     min_citation_count: int = 0,
     fields_of_study: str = "",
+    tool_context: StateContext | None = None,
 ) -> str:
     """Search for academic papers via Semantic Scholar bulk search API.
 
@@ -59,8 +195,9 @@ def semanticscholar_search_bulk(
             Biology, Physics, etc.
 
     Returns:
-        JSON string of response with total, token (if more results), and data
-        array of papers.
+        JSON string with total, token (if more results), and a data array of
+        compact paper summaries (abstracts truncated, first authors only). Full
+        records are kept for the session; use get_paper_details with paperIds.
     """
     params: dict[str, str] = {
         "query": query,
@@ -80,19 +217,241 @@ def semanticscholar_search_bulk(
     if fields_of_study:
         params["fieldsOfStudy"] = fields_of_study
 
+    progress = ProgressReporter("semanticscholar_search_bulk", tool_context)
+    progress(f"Searching Semantic Scholar for {query!r}", query=query)
     url = f"{SEMANTIC_SCHOLAR_API}?{urlencode(params)}"
-    headers: dict[str, str] = {"Accept": "application/json"}
-    api_key = os.environ.get("SEMANTIC_SCHOLAR_API_KEY")
-    if api_key:
-        headers["x-api-key"] = api_key
-
-    req = Request(url, headers=headers)
-    with urlopen(req, timeout=30) as resp:
-        data = json.loads(resp.read().decode())
+    data = await asyncio.to_thread(_s2_request, "GET", url)
 
     # Truncate to at most limit papers (API returns up to 1000 per call).
     if "data" in data and isinstance(data["data"], list):
         max_papers = min(max(1, limit), 100)
         data["data"] = data["data"][:max_papers]
+        # Full records go to the session's paper store; the model and session
+        # state only get compact summaries and references.
+        remember_papers(tool_context, data["data"])
+        if tool_context is not None:
+            # Agents usually read the top hits next: warm the page cache for them.
+            prefetcher.schedule(
+                tool_context.state.get(PAPER_STORE_STATE_KEY) or "",
+                [p.get("url") for p in data["data"]],
+            )
+        data["data"] = [summarize_paper(p) for p in data["data"]]
+
+    papers = data.get("data") or []
+    progress(
+        f"Found {len(papers)} papers for {query!r}",
+        done=True,
+        total=data.get("total"),
+        papers=_paper_refs(papers),
+    )
+    return json.dumps(data, ensure_ascii=False)
+
+
+async def get_paper_details(
+    paper_ids: list[str],
+    fields: str = "",
+    tool_context: StateContext | None = None,
+) -> str:
+    """Get full records for many papers at once.
+
+    Search results only carry truncated abstracts and the first authors; use
+    this to read the complete record (full abstract, all authors, citation
+    counts, DOI, etc.) of specific papers, e.g. before synthesizing or
+    critiquing them. Papers already found in this session are answered locally;
+    any others are fetched from Semantic Scholar in one batched request.
+
+    Args:
+        paper_ids: Semantic Scholar paperIds (or prefixed ids such as
+            "DOI:10.1145/...", "ARXIV:1706.03762", "CorpusId:123").
+        fields: Comma-separated fields to return (optional, empty for all stored
+            fields), e.g. "title,abstract,authors".
+
+    Returns:
+        JSON string with a papers array of full records and a missing array of
+        ids that could not be resolved.
+    """
+    store = paper_stores.for_context(tool_context)
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    ids = list(dict.fromkeys(paper_ids))
+
+    found: dict[str, dict[str, Any]] = {}
+    to_fetch: list[str] = []
+    for paper_id in ids:
+        paper = store.get(paper_id) if store is not None else None
+        if paper is None or not wanted.issubset(paper):
+            to_fetch.append(paper_id)
+        else:
+            found[paper_id] = paper
+
+    errors: list[str] = []
+    progress = ProgressReporter("get_paper_details", tool_context)
+    if to_fetch:
+        progress(
+            f"{len(found)} papers from this session, fetching {len(to_fetch)}",
+            resolved=len(found),
+            fetching=len(to_fetch),
+        )
+        fetch_fields = ",".join(sorted(wanted - {"paperId"})) if wanted else _DETAIL_FIELDS
+        chunks = [
+            to_fetch[i : i + _BATCH_MAX_IDS] for i in range(0, len(to_fetch), _BATCH_MAX_IDS)
+        ]
+        results = await _gather_limited(
+            [partial(_fetch_batch, chunk, fetch_fields) for chunk in chunks], _GRAPH_CONCURRENCY
+        )
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                errors.append(f"batch of {len(chunk)}: {result}")
+                continue
+            remember_papers(tool_context, [p for p in result if p is not None])
+            # Results follow the requested order; prefixed ids (e.g. DOI:...)
+            # come back under their canonical paperId.
+            for requested, paper in zip(chunk, result):
+                if paper is None:
+                    continue
+                merged = store.get(paper["paperId"]) if store is not None else None
+                found[requested] = merged or paper
+
+    papers: list[dict[str, Any]] = []
+    missing: list[str] = []
+    for paper_id in ids:
+        paper = found.get(paper_id)
+        if paper is None:
+            missing.append(paper_id)
+            continue
+        if wanted:
+            paper = {k: v for k, v in paper.items() if k in wanted or k == "paperId"}
+        papers.append(paper)
+    progress(f"Resolved {len(papers)} of {len(ids)} papers", done=True, missing=len(missing))
+    result: dict[str, Any] = {"papers": papers, "missing": missing}
+    if errors:
+        result["errors"] = errors
+    return json.dumps(result, ensure_ascii=False)
+
+
+async def expand_citation_graph(
+    paper_ids: list[str],
+    depth: int = 1,
+    direction: str = "both",
+    max_per_paper: int = 50,
+    max_papers: int = 200,
+    fields: str = _GRAPH_FIELDS,
+    tool_context: StateContext | None = None,
+) -> str:
+    """Explore the citation graph around papers in a single call.
+
+    Expands breadth-first from the seed papers: level 1 holds the papers that
+    cite and/or are cited by the seeds, level 2 their neighbours, and so on.
+    Papers are deduplicated across levels. Beyond level 1 only the most cited
+    papers of each level are expanded further. Use this instead of repeated
+    keyword searches to find citing papers, references or related work.
+
+    Args:
+        paper_ids: Seed Semantic Scholar paperIds (or "DOI:...", "ARXIV:..." ids).
+        depth: Number of levels to expand, 1 to 3. Default 1.
+        direction: "citations" (papers citing the seeds), "references" (papers
+            the seeds cite) or "both". Default "both".
+        max_per_paper: Maximum neighbours fetched per paper and direction (1-1000).
+            Default 50.
+        max_papers: Maximum number of new papers returned in total. Default 200.
+        fields: Comma-separated paper fields. Default: title,url,venue,year,citationCount.
+
+    Returns:
+        JSON string with seeds, levels (each a list of compact paper summaries),
+        edges as [citing paperId, cited paperId] pairs among the returned papers,
+        truncated (true if max_papers was reached) and any per-paper errors.
+    """
+    relations = {
+        "citations": ["citations"],
+        "references": ["references"],
+        "both": ["citations", "references"],
+    }.get(direction)
+    if relations is None:
+        return json.dumps(
+            {"error": f"direction must be citations, references or both, got {direction!r}"}
+        )
+    depth = min(max(1, depth), _MAX_GRAPH_DEPTH)
+    max_per_paper = min(max(1, max_per_paper), 1000)
+    max_papers = min(max(1, max_papers), _MAX_GRAPH_PAPERS)
+    if "citationCount" not in fields.split(","):
+        fields = f"{fields},citationCount"
+
+    seeds = list(dict.fromkeys(paper_ids))
+    progress = ProgressReporter("expand_citation_graph", tool_context)
+    errors: list[str] = []
+    seed_records: list[dict[str, Any]] = []
+    try:
+        batch = await asyncio.to_thread(_fetch_batch, seeds[:_BATCH_MAX_IDS], fields)
+        seed_records = [p for p in batch if p is not None]
+    except (OSError, ValueError) as e:  # HTTP/network errors or a malformed response
+        errors.append(f"seed details: {e}")
+    # Canonical paperIds, so seeds given as DOI:/ARXIV: ids deduplicate correctly.
+    frontier = [p["paperId"] for p in seed_records] or seeds
+    seen = set(frontier) | set(seeds)
+    edges: set[tuple[str, str]] = set()
+    levels: list[dict[str, Any]] = []
+    added = 0
+    truncated = False
+
+    for level in range(1, depth + 1):
+        if not frontier or truncated:
+            break
+        cancellation.checkpoint()
+        calls = [(pid, rel) for pid in frontier for rel in relations]
+
+        def on_done(finished: int, level: int = level, total: int = len(calls)) -> None:
+            progress(
+                f"Level {level}: expanded {finished} of {total}",
+                depth=level,
+                finished=finished,
+                total=total,
+            )
+
+        results = await _gather_limited(
+            [partial(_fetch_neighbours, pid, rel, max_per_paper, fields) for pid, rel in calls],
+            _GRAPH_CONCURRENCY,
+            on_done,
+        )
+        level_papers: list[dict[str, Any]] = []
+        for (pid, rel), result in zip(calls, results):
+            if isinstance(result, Exception):
+                errors.append(f"{rel} of {pid}: {result}")
+                continue
+            for paper in result:
+                nid = paper["paperId"]
+                edges.add((nid, pid) if rel == "citations" else (pid, nid))
+                if nid in seen:
+                    continue
+                if added >= max_papers:
+                    truncated = True
+                    continue
+                seen.add(nid)
+                added += 1
+                level_papers.append(paper)
+        remember_papers(tool_context, level_papers)
+        levels.append(
+            {"depth": level, "papers": [summarize_paper(p) for p in level_papers]}
+        )
+        progress(
+            f"Level {level}: {len(level_papers)} new papers ({added} in total)",
+            depth=level,
+            papers=_paper_refs(level_papers),
+        )
+        most_cited = sorted(level_papers, key=lambda p: p.get("citationCount") or 0, reverse=True)
+        frontier = [p["paperId"] for p in most_cited[:_MAX_EXPAND_PER_LEVEL]]
+
+    remember_papers(tool_context, seed_records)
+    progress(f"Found {added} related papers in {len(levels)} levels", done=True, total=added)
+    result: dict[str, Any] = {
+        "seeds": [summarize_paper(p) for p in seed_records],
+        "levels": levels,
+        "edges": sorted([a, b] for a, b in edges if a in seen and b in seen),
+        "truncated": truncated,
+    }
+    if errors:
+        result["errors"] = errors
+    return json.dumps(result, ensure_ascii=False)
+
 
-    return json.dumps(data, indent=2, ensure_ascii=False)
+def warm_connection() -> None:
+    """Open a pooled connection to Semantic Scholar so the first search skips DNS and TLS."""
+    http_pool.warm(SEMANTIC_SCHOLAR_API)
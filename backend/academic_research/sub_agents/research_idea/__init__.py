@@ -14,5 +14,14 @@
 
 """Research idea agent for finding new research lines."""
 
-# pylint: disable=unused-import
-from .agent import research_idea_agent
+from typing import Any
+
+__all__ = ["research_idea_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "research_idea_agent":
+        from .agent import research_idea_agent
+
+        return research_idea_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
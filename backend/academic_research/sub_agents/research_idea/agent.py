@@ -16,10 +16,10 @@
 
 from google.adk import Agent
 
+from academic_research.sub_agents.paper_search.tools import get_paper_details
+from academic_research.util.models import routed_model
 from academic_research.util.prompts import load_prompt
-from academic_research.util.tools import fetch_url
-
-MODEL = "gemini-2.5-flash"
+from academic_research.util.tools import fetch_url, fetch_urls
 
 
 class ResearchIdeaAgent(Agent):
@@ -28,9 +28,9 @@ class ResearchIdeaAgent(Agent):
 
 
 research_idea_agent = ResearchIdeaAgent(
-    model=MODEL,
+    model=routed_model("research_idea"),
     name="research_idea_agent",
     description=load_prompt("research_idea/description"),
     instruction=load_prompt("research_idea/instruction"),
-    tools=[fetch_url],
+    tools=[fetch_url, fetch_urls, get_paper_details],
 )
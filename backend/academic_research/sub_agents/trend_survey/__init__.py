@@ -14,5 +14,14 @@
 
 """Trend survey agent for identifying research trends and emerging topics."""
 
-# pylint: disable=unused-import
-from .agent import trend_survey_agent
+from typing import Any
+
+__all__ = ["trend_survey_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "trend_survey_agent":
+        from .agent import trend_survey_agent
+
+        return trend_survey_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
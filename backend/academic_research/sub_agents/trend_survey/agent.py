@@ -16,11 +16,14 @@
 
 from google.adk import Agent
 
+from academic_research.util.models import routed_model
 from academic_research.util.prompts import load_prompt
 
-from academic_research.sub_agents.paper_search.tools import semanticscholar_search_bulk
-
-MODEL = "gemini-2.5-flash"
+from academic_research.sub_agents.paper_search.tools import (
+    expand_citation_graph,
+    get_paper_details,
+    semanticscholar_search_bulk,
+)
 
 
 class TrendSurveyAgent(Agent):
@@ -29,9 +32,9 @@ class TrendSurveyAgent(Agent):
 
 
 trend_survey_agent = TrendSurveyAgent(
-    model=MODEL,
+    model=routed_model("trend_survey"),
     name="trend_survey_agent",
     description=load_prompt("trend_survey/description"),
     instruction=load_prompt("trend_survey/instruction"),
-    tools=[semanticscholar_search_bulk],
+    tools=[semanticscholar_search_bulk, get_paper_details, expand_citation_graph],
 )
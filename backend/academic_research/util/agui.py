@@ -0,0 +1,156 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""AG-UI integration: the ADKAgent used by main.py.
+
+Adds tool progress streaming and run cancellation on client disconnect or
+deadline to ag_ui_adk's ADKAgent.
+
+Imports ag_ui_adk (and with it google.adk), so import this only where the
+agent is built.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from typing import Any
+
+from ag_ui.core import BaseEvent, CustomEvent, EventType, RunAgentInput
+from ag_ui_adk import ADKAgent
+
+from academic_research.util.cancellation import (
+    RunBudget,
+    client_disconnected,
+    current_budget,
+    run_budget,
+)
+from academic_research.util.progress import PROGRESS_EVENT_NAME, progress_sink
+
+logger = logging.getLogger(__name__)
+
+_RUN_END_TYPES = (EventType.RUN_FINISHED, EventType.RUN_ERROR)
+
+
+async def merge_progress(
+    run: Callable[[], AsyncIterator[BaseEvent]],
+    *,
+    stop: asyncio.Event | None = None,
+) -> AsyncIterator[BaseEvent]:
+    """Yield the events of run() interleaved with tool progress reported meanwhile.
+
+    run() is iterated by a separate task that has a progress sink installed,
+    so tools called during the run (in tasks or worker threads it starts)
+    report into it. Progress is only emitted between RUN_STARTED and the end
+    of that run, as the AG-UI protocol requires; other reports are dropped.
+
+    When stop is set, the stream ends right away and run() is closed.
+    """
+    # Events and progress reports share one queue, so their order is preserved.
+    items: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def on_progress(report: dict[str, Any]) -> None:
+        # Tools may report from worker threads.
+        loop.call_soon_threadsafe(items.put_nowait, ("progress", report))
+
+    async def pump() -> None:
+        events = run()
+        try:
+            with progress_sink(on_progress):
+                async for event in events:
+                    items.put_nowait(("event", event))
+        except Exception as e:  # noqa: BLE001 - re-raised in the consuming task
+            items.put_nowait(("error", e))
+        finally:
+            # Also on cancellation, so the run's own cleanup (finally blocks) executes.
+            await events.aclose()
+            items.put_nowait(("end", None))
+
+    task = asyncio.create_task(pump())
+    stop_waiter = asyncio.create_task(stop.wait()) if stop is not None else None
+    if stop_waiter is not None:
+        stop_waiter.add_done_callback(lambda f: f.cancelled() or items.put_nowait(("stop", None)))
+    in_run = False
+    try:
+        while True:
+            kind, item = await items.get()
+            if kind in ("end", "stop"):
+                break
+            if kind == "error":
+                raise item
+            if kind == "progress":
+                if in_run:
+                    yield CustomEvent(type=EventType.CUSTOM, name=PROGRESS_EVENT_NAME, value=item)
+                continue
+            if item.type == EventType.RUN_STARTED:
+                in_run = True
+            elif item.type in _RUN_END_TYPES:
+                in_run = False
+            yield item
+    finally:
+        if stop_waiter is not None:
+            stop_waiter.cancel()
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+class ResearchADKAgent(ADKAgent):
+    """ADKAgent with tool progress events and run cancellation.
+
+    Tool progress (academic_research.util.progress) is streamed as CUSTOM
+    events. Each run gets a RunBudget (academic_research.util.cancellation)
+    whose deadline is the execution timeout; the ADK execution task is bound to
+    it, so a client disconnect (seen via DisconnectWatcher) or the deadline
+    cancels the whole run tree: model calls, sub-agents and tools.
+    """
+
+    async def run(self, input: RunAgentInput) -> AsyncIterator[BaseEvent]:
+        budget = RunBudget(self._execution_timeout)
+        disconnected = client_disconnected()
+        events = merge_progress(lambda: self._run_with_budget(input, budget), stop=disconnected)
+        finished = False
+        try:
+            async for event in events:
+                yield event
+            finished = True
+        finally:
+            if disconnected is not None and disconnected.is_set():
+                logger.info("Client disconnected; cancelling run %s", input.run_id)
+                budget.cancel("client disconnected")
+            elif not finished or budget.expired:
+                budget.cancel("run stopped" if not finished else "run deadline exceeded")
+            await events.aclose()
+
+    async def _run_with_budget(
+        self, input: RunAgentInput, budget: RunBudget
+    ) -> AsyncIterator[BaseEvent]:
+        # Iterated by merge_progress's pump task only, so the context variable
+        # is set and reset in one context; tasks started by the run inherit it.
+        with run_budget(budget):
+            async for event in super().run(input):
+                yield event
+
+    # Private ADKAgent hook: the only place the execution task is visible.
+    # pyproject.toml pins ag-ui-adk to the minor release this was tested with.
+    async def _start_background_execution(self, input: RunAgentInput, **kwargs: Any) -> Any:
+        execution = await super()._start_background_execution(input, **kwargs)
+        budget = current_budget()
+        if budget is not None:
+            budget.bind(execution.task)
+        return execution
@@ -0,0 +1,199 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-run deadline and cooperative cancellation.
+
+Each AG-UI run gets a RunBudget: a deadline plus a cancel flag. It is set when
+the client disconnects or the deadline passes. The budget travels in a context
+variable, so tools (also in asyncio.to_thread workers) and model calls can
+shrink their timeouts with tool_timeout() and stop between steps with
+checkpoint(). Cancelling a budget also cancels the asyncio tasks bound to it,
+i.e. the ADK execution of the run. Blocking I/O already in flight in a worker
+thread is not interrupted, but it is bounded by the shrunken timeout, and no
+new request starts once the run is cancelled.
+
+DisconnectWatcher is ASGI middleware that notices client disconnects while a
+response is streaming, which Starlette alone only detects on the next write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+# Timeouts are never shrunk below this, so a nearly spent budget still allows
+# one short request instead of failing instantly.
+_MIN_TIMEOUT_SECONDS = 1.0
+
+
+class RunCancelled(Exception):
+    """The run was cancelled (client disconnected) or its deadline passed."""
+
+
+class RunBudget:
+    """Deadline and cancel flag of one agent run; safe to use from worker threads."""
+
+    def __init__(self, seconds: float | None = None) -> None:
+        self._deadline = time.monotonic() + seconds if seconds else None
+        self._cancelled = threading.Event()
+        self._reason = ""
+        self._tasks: list[asyncio.Future[Any]] = []
+
+    def remaining(self) -> float | None:
+        """Seconds left until the deadline, or None without a deadline."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or self.expired
+
+    @property
+    def reason(self) -> str:
+        if self._reason:
+            return self._reason
+        return "run deadline exceeded" if self.expired else ""
+
+    def bind(self, task: asyncio.Future[Any]) -> None:
+        """Cancel task together with the run (call from the event loop thread)."""
+        if self._cancelled.is_set():
+            task.cancel()
+        else:
+            self._tasks.append(task)
+
+    def cancel(self, reason: str = "run cancelled") -> None:
+        """Cancel the run: set the flag and cancel bound tasks (call from the event loop thread)."""
+        if not self._cancelled.is_set():
+            self._reason = reason
+            self._cancelled.set()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def check(self) -> None:
+        """Raise RunCancelled if the run was cancelled or is out of time."""
+        if self.cancelled:
+            raise RunCancelled(self.reason)
+
+    def timeout(self, default: float) -> float:
+        """default, shrunk to the time left in the run; raises RunCancelled when none is left."""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return min(default, max(remaining, _MIN_TIMEOUT_SECONDS))
+
+    def sleep(self, seconds: float) -> None:
+        """Blocking sleep that ends early, raising RunCancelled, when the run is cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._cancelled.wait(seconds)
+        self.check()
+
+
+_budget: ContextVar[RunBudget | None] = ContextVar("run_budget", default=None)
+
+
+def current_budget() -> RunBudget | None:
+    return _budget.get()
+
+
+@contextmanager
+def run_budget(budget: RunBudget) -> Iterator[RunBudget]:
+    """Make budget the current run's budget in this context (and the tasks/threads it starts)."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def tool_timeout(default: float) -> float:
+    """Timeout for one request: default, shrunk to what is left of the current run."""
+    budget = _budget.get()
+    return budget.timeout(default) if budget is not None else default
+
+
+def checkpoint() -> None:
+    """Raise RunCancelled if the current run was cancelled; call between steps of long tools."""
+    budget = _budget.get()
+    if budget is not None:
+        budget.check()
+
+
+def sleep(seconds: float) -> None:
+    """time.sleep that wakes up (raising RunCancelled) when the current run is cancelled."""
+    budget = _budget.get()
+    if budget is None:
+        time.sleep(seconds)
+    else:
+        budget.sleep(seconds)
+
+
+_disconnected: ContextVar[asyncio.Event | None] = ContextVar("client_disconnected", default=None)
+
+
+def client_disconnected() -> asyncio.Event | None:
+    """Event set when the client of the current HTTP request disconnects (see DisconnectWatcher)."""
+    return _disconnected.get()
+
+
+class DisconnectWatcher:
+    """ASGI middleware that reads the request channel itself to notice disconnects early.
+
+    Messages are passed on to the wrapped app unchanged; the handler sees the
+    disconnect through client_disconnected().
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        disconnected = asyncio.Event()
+        messages: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def app_receive() -> dict[str, Any]:
+            if disconnected.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        watcher = asyncio.create_task(watch())
+        token = _disconnected.set(disconnected)
+        try:
+            await self.app(scope, app_receive, send)
+        finally:
+            _disconnected.reset(token)
+            watcher.cancel()
@@ -0,0 +1,235 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keep-alive HTTP connection pool and rate limiting for the research tools.
+
+urllib opens a new TCP + TLS connection per request. For fixed API hosts such
+as Semantic Scholar the pool keeps idle connections open so repeated tool calls
+skip DNS and the TLS handshake, and warm-up can open them before the first user
+request arrives. RateLimiter lets concurrent tool calls share one API quota.
+"""
+
+from __future__ import annotations
+
+import http.client
+import io
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+from academic_research.util import cancellation
+
+# Idle connections older than this are closed instead of reused (servers drop them).
+_IDLE_TIMEOUT_SECONDS = 50.0
+_MAX_IDLE_PER_HOST = 8
+
+# Errors that mean a reused keep-alive connection was closed by the server.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_HostKey = tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class Response:
+    """A fully-read HTTP response."""
+
+    status: int
+    headers: http.client.HTTPMessage
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive http.client connections, keyed by host."""
+
+    def __init__(
+        self,
+        *,
+        max_idle_per_host: int = _MAX_IDLE_PER_HOST,
+        idle_timeout: float = _IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self._max_idle_per_host = max_idle_per_host
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle: dict[_HostKey, list[tuple[float, http.client.HTTPConnection]]] = {}
+        self._created = 0
+        self._reused = 0
+
+    @staticmethod
+    def _host_key(url: str) -> _HostKey:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL for connection pool: {url!r}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return parts.scheme, parts.hostname, port
+
+    def _connect(self, key: _HostKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        conn_cls = (
+            http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        )
+        with self._lock:
+            self._created += 1
+        return conn_cls(host, port, timeout=timeout)
+
+    def _acquire(self, key: _HostKey, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                released_at, conn = idle.pop()
+                if now - released_at < self._idle_timeout:
+                    self._reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._connect(key, timeout), False
+
+    def _release(self, key: _HostKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle_per_host:
+                idle.append((time.monotonic(), conn))
+                return
+        conn.close()
+
+    def warm(self, url: str, *, timeout: float = 10.0) -> None:
+        """Open a connection (DNS, TCP and TLS) to the URL's host and park it in the pool."""
+        key = self._host_key(url)
+        conn = self._connect(key, timeout)
+        try:
+            conn.connect()
+        except Exception:
+            conn.close()
+            raise
+        self._release(key, conn)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout: float = 30.0,
+    ) -> Response:
+        """Send a request over a pooled connection and read the whole response.
+
+        Raises:
+            HTTPError: For 4xx/5xx responses, mirroring urllib.request.urlopen.
+        """
+        key = self._host_key(url)
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                data = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    # The server closed an idle connection; retry on a fresh one.
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        if resp.status >= 400:
+            raise HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+        return Response(status=resp.status, headers=resp.headers, body=data)
+
+    def stats(self) -> dict[str, Any]:
+        """Connection counters and idle connections per host."""
+        with self._lock:
+            return {
+                "created": self._created,
+                "reused": self._reused,
+                "idle": {f"{s}://{h}:{p}": len(c) for (s, h, p), c in self._idle.items()},
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for _, conn in conns:
+                conn.close()
+
+
+class RateLimiter:
+    """Thread-safe token bucket: on average at most ``rate`` acquisitions per second.
+
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self) -> None:
+        """Block until a request may be sent.
+
+        The wait ends early with RunCancelled when the current run is
+        cancelled, and a cancelled run never takes a token, so it does not use
+        up the quota of the runs still waiting.
+        """
+        if self._rate <= 0:
+            return
+        while True:
+            cancellation.checkpoint()
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            cancellation.sleep(wait)
+
+
+# Shared by all tools in this process.
+http_pool = ConnectionPool()
@@ -0,0 +1,399 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-agent model configuration and latency-aware model routing.
+
+Every agent gets a RoutedModel instead of a fixed model name. On each model
+call the ModelRouter picks a tier (light / standard / heavy) from the agent's
+configured task type, the size of the request and the observed latency and
+error rate of each model, and falls back to a secondary model when the call
+times out or the API is overloaded. Decisions are kept for /debug/routing so
+the tiers and thresholds can be tuned for cost versus latency.
+
+Environment:
+    MODEL_TIER_LIGHT, MODEL_TIER_STANDARD, MODEL_TIER_HEAVY: Model per tier.
+    MODEL_<AGENT>: Pin one agent to a model, e.g. MODEL_COORDINATOR=gemini-2.5-flash.
+    MODEL_ROUTING: "off" always uses each agent's default tier.
+
+Passing a model name string to an ADK agent makes ADK build a new Gemini
+wrapper, and with it a new genai client and HTTP connection pool, for every
+model call. Calls go through get_model() instead so they share one client per
+model and warm-up can open its connections ahead of the first request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors as genai_errors
+
+from academic_research.util.cancellation import RunCancelled, tool_timeout
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("light", "standard", "heavy")
+
+_TIER_MODELS = {
+    "light": os.getenv("MODEL_TIER_LIGHT", "gemini-2.5-flash-lite"),
+    "standard": os.getenv("MODEL_TIER_STANDARD", "gemini-2.5-flash"),
+    "heavy": os.getenv("MODEL_TIER_HEAVY", "gemini-2.5-pro"),
+}
+
+_ROUTING_ENABLED = os.getenv("MODEL_ROUTING", "on").strip().lower() not in ("off", "0", "false")
+
+# Synthesis turns above this many estimated input tokens move up one tier.
+_LONG_INPUT_TOKENS = 30000
+# A model is treated as degraded above this error rate (over its recent calls)...
+_MAX_ERROR_RATE = 0.3
+_MIN_SAMPLES = 4
+# ...or when its average latency exceeds this fraction of the agent's timeout.
+_SLOW_LATENCY_FRACTION = 0.6
+_RECENT_CALLS = 50
+_DECISION_LOG_SIZE = 500
+# API error codes worth retrying on the fallback model (overload / server errors).
+_FALLBACK_ERROR_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class AgentModelConfig:
+    """How the router treats one agent.
+
+    Attributes:
+        task: "routing", "retrieval" or "synthesis"; synthesis may escalate on long input.
+        tier: Default tier for the agent.
+        max_tier: Highest tier the router may escalate to.
+        timeout_s: Per-response timeout before falling back to the secondary model.
+    """
+
+    task: str
+    tier: str
+    max_tier: str
+    timeout_s: float
+
+
+AGENT_MODELS: dict[str, AgentModelConfig] = {
+    # Delegation and short presentation turns: the cheapest tier is enough.
+    "coordinator": AgentModelConfig("routing", "light", "standard", 30.0),
+    "paper_search": AgentModelConfig("retrieval", "light", "standard", 45.0),
+    "trend_survey": AgentModelConfig("retrieval", "standard", "standard", 60.0),
+    "literature_synthesizer": AgentModelConfig("synthesis", "standard", "heavy", 120.0),
+    "paper_critic": AgentModelConfig("synthesis", "standard", "heavy", 120.0),
+    "research_idea": AgentModelConfig("synthesis", "standard", "heavy", 120.0),
+    # Map-reduce synthesis (synthesize_in_batches): batch summaries are short
+    # and run in parallel; merging partial syntheses gets the stronger tier.
+    "synthesis_map": AgentModelConfig("synthesis", "light", "standard", 60.0),
+    "synthesis_reduce": AgentModelConfig("synthesis", "standard", "heavy", 120.0),
+}
+
+_models: dict[str, Gemini] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(name: str) -> Gemini:
+    """Return the process-wide Gemini instance for a model name."""
+    with _models_lock:
+        model = _models.get(name)
+        if model is None:
+            model = _models[name] = Gemini(model=name)
+        return model
+
+
+def _pinned_model(agent: str) -> str | None:
+    return os.getenv(f"MODEL_{agent.upper()}") or None
+
+
+def _estimate_tokens(llm_request: LlmRequest) -> int:
+    """Rough input size: ~4 characters per token over text and tool payloads."""
+    chars = 0
+    config = llm_request.config
+    if config is not None and isinstance(config.system_instruction, str):
+        chars += len(config.system_instruction)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_response is not None:
+                chars += len(str(part.function_response.response))
+            elif part.function_call is not None:
+                chars += len(str(part.function_call.args))
+    return chars // 4
+
+
+def _turn_kind(llm_request: LlmRequest) -> str:
+    if llm_request.contents:
+        parts = llm_request.contents[-1].parts or []
+        if any(p.function_response is not None for p in parts):
+            return "tool_result"
+    return "user"
+
+
+@dataclass
+class _ModelStats:
+    calls: int = 0
+    errors: int = 0
+    ewma_latency_s: float | None = None
+    recent: deque = field(default_factory=lambda: deque(maxlen=_RECENT_CALLS))
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.recent.append(ok)
+        if ok:
+            self.ewma_latency_s = (
+                latency_s
+                if self.ewma_latency_s is None
+                else 0.8 * self.ewma_latency_s + 0.2 * latency_s
+            )
+
+    @property
+    def error_rate(self) -> float:
+        return (self.recent.count(False) / len(self.recent)) if self.recent else 0.0
+
+
+@dataclass
+class RoutingDecision:
+    """One routed model call, kept in the router's decision log."""
+
+    agent: str
+    model: str
+    tier: str | None
+    fallback: str | None
+    timeout_s: float
+    input_tokens: int
+    turn: str
+    reasons: list[str]
+    timestamp: float = field(default_factory=time.time)
+    used_model: str | None = None
+    fell_back: bool = False
+    latency_s: float | None = None
+    outcome: str = "pending"
+
+
+class ModelRouter:
+    """Chooses a model per call and tracks per-model latency and error rates."""
+
+    def __init__(self, configs: dict[str, AgentModelConfig]) -> None:
+        self._configs = configs
+        self._lock = threading.Lock()
+        self._stats: dict[str, _ModelStats] = {}
+        self._decisions: deque[RoutingDecision] = deque(maxlen=_DECISION_LOG_SIZE)
+
+    def _degraded(self, model: str, timeout_s: float) -> str | None:
+        with self._lock:
+            stats = self._stats.get(model)
+            if stats is None or len(stats.recent) < _MIN_SAMPLES:
+                return None
+            if stats.error_rate > _MAX_ERROR_RATE:
+                return f"{model} error rate {stats.error_rate:.0%}"
+            if stats.ewma_latency_s and stats.ewma_latency_s > timeout_s * _SLOW_LATENCY_FRACTION:
+                return f"{model} latency {stats.ewma_latency_s:.1f}s"
+        return None
+
+    def route(self, agent: str, llm_request: LlmRequest) -> RoutingDecision:
+        cfg = self._configs[agent]
+        tokens = _estimate_tokens(llm_request)
+        turn = _turn_kind(llm_request)
+
+        pinned = _pinned_model(agent)
+        if pinned:
+            return RoutingDecision(
+                agent, pinned, None, None, cfg.timeout_s, tokens, turn, ["pinned"]
+            )
+
+        index = TIERS.index(cfg.tier)
+        reasons = [f"task={cfg.task}", f"default={cfg.tier}"]
+        if _ROUTING_ENABLED:
+            max_index = TIERS.index(cfg.max_tier)
+            if cfg.task == "synthesis" and tokens > _LONG_INPUT_TOKENS and index < max_index:
+                index += 1
+                reasons.append(f"long input ({tokens} tokens)")
+            degraded = self._degraded(_TIER_MODELS[TIERS[index]], cfg.timeout_s)
+            if degraded and index > 0:
+                index -= 1
+                reasons.append(f"degraded: {degraded}")
+
+        model = _TIER_MODELS[TIERS[index]]
+        # Secondary model: the tier below, or the tier above for the lightest tier.
+        fallback = _TIER_MODELS[TIERS[index - 1 if index > 0 else 1]]
+        return RoutingDecision(
+            agent,
+            model,
+            TIERS[index],
+            fallback if fallback != model else None,
+            cfg.timeout_s,
+            tokens,
+            turn,
+            reasons,
+        )
+
+    def record(self, model: str, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self._stats.setdefault(model, _ModelStats()).record(latency_s, ok)
+
+    def finish(self, decision: RoutingDecision) -> None:
+        with self._lock:
+            self._decisions.append(decision)
+        logger.debug("Model routing decision: %s", decision)
+
+    def default_models(self) -> list[str]:
+        """Models the configured agents start on, plus their fallbacks."""
+        names: set[str] = set()
+        for agent, cfg in self._configs.items():
+            pinned = _pinned_model(agent)
+            if pinned:
+                names.add(pinned)
+                continue
+            index = TIERS.index(cfg.tier)
+            names.add(_TIER_MODELS[cfg.tier])
+            names.add(_TIER_MODELS[TIERS[index - 1 if index > 0 else 1]])
+        return sorted(names)
+
+    def report(self, last: int = 50) -> dict[str, Any]:
+        with self._lock:
+            models = {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "recent_error_rate": round(s.error_rate, 3),
+                    "ewma_latency_s": round(s.ewma_latency_s, 3) if s.ewma_latency_s else None,
+                }
+                for name, s in self._stats.items()
+            }
+            decisions = [asdict(d) for d in list(self._decisions)[-last:]]
+        return {
+            "routing_enabled": _ROUTING_ENABLED,
+            "tiers": dict(_TIER_MODELS),
+            "agents": {name: asdict(cfg) for name, cfg in self._configs.items()},
+            "models": models,
+            "decisions": decisions,
+        }
+
+
+model_router = ModelRouter(AGENT_MODELS)
+
+
+def _should_fall_back(error: BaseException) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return isinstance(error, genai_errors.APIError) and error.code in _FALLBACK_ERROR_CODES
+
+
+class RoutedModel(BaseLlm):
+    """ADK model that asks the ModelRouter which Gemini model to call for each turn."""
+
+    agent: str
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        decision = model_router.route(self.agent, llm_request)
+        candidates = [decision.model] + ([decision.fallback] if decision.fallback else [])
+        try:
+            for attempt, name in enumerate(candidates):
+                llm_request.model = name
+                start = time.perf_counter()
+                responses = get_model(name).generate_content_async(llm_request, stream=stream)
+                yielded = False
+                try:
+                    while True:
+                        # Shrunk to what is left of the run; raises RunCancelled if none is.
+                        timeout = tool_timeout(decision.timeout_s)
+                        try:
+                            response = await asyncio.wait_for(responses.__anext__(), timeout)
+                        except StopAsyncIteration:
+                            break
+                        except asyncio.TimeoutError:
+                            if timeout < decision.timeout_s:
+                                # The run's deadline ran out, not the model's timeout.
+                                raise RunCancelled("run deadline exceeded") from None
+                            raise
+                        yielded = True
+                        yield response
+                except RunCancelled:
+                    # Cancellation and run deadlines say nothing about the model's health.
+                    decision.used_model, decision.outcome = name, "cancelled"
+                    raise
+                except Exception as e:
+                    latency = time.perf_counter() - start
+                    model_router.record(name, latency, ok=False)
+                    is_last = attempt == len(candidates) - 1
+                    if yielded or is_last or not _should_fall_back(e):
+                        decision.used_model, decision.outcome = name, f"error: {type(e).__name__}"
+                        raise
+                    logger.warning(
+                        "Model %s failed for %s (%s); falling back to %s",
+                        name,
+                        self.agent,
+                        type(e).__name__,
+                        candidates[attempt + 1],
+                    )
+                    decision.fell_back = True
+                    continue
+                finally:
+                    await responses.aclose()
+                latency = time.perf_counter() - start
+                model_router.record(name, latency, ok=True)
+                decision.used_model, decision.latency_s, decision.outcome = (
+                    name,
+                    round(latency, 3),
+                    "ok",
+                )
+                return
+        finally:
+            model_router.finish(decision)
+
+
+_routed_models: dict[str, RoutedModel] = {}
+
+
+def routed_model(agent: str) -> RoutedModel:
+    """Return the RoutedModel for an agent key in AGENT_MODELS."""
+    if agent not in AGENT_MODELS:
+        raise ValueError(f"No model configuration for agent: {agent!r}")
+    with _models_lock:
+        model = _routed_models.get(agent)
+        if model is None:
+            cfg = AGENT_MODELS[agent]
+            model = _routed_models[agent] = RoutedModel(
+                model=_pinned_model(agent) or _TIER_MODELS[cfg.tier], agent=agent
+            )
+        return model
+
+
+async def warm_models() -> list[str]:
+    """Create the genai client of every default model and open its connection.
+
+    Fetches model metadata, which needs no tokens but completes DNS, TLS and
+    auth, leaving a live connection in the client's pool.
+
+    Returns:
+        Names of the models that were warmed.
+    """
+    names = model_router.default_models()
+    for name in names:
+        model = get_model(name)
+        await model.api_client.aio.models.get(model=model.model)
+    return names
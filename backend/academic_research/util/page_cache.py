@@ -0,0 +1,295 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of fetched page text, and speculative prefetch of likely next reads.
+
+After a search, agents usually read the top hits next. The Prefetcher fetches
+those URLs in the background so the following fetch_url finds them in the
+PageCache, or joins the fetch still in flight instead of starting another.
+Metrics (hit rate, prefetched pages used vs. wasted) show whether it pays off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MAX_BYTES = int(float(os.getenv("PAGE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", "900"))
+# Search hits prefetched per search (0 disables prefetching) and parallel prefetches.
+_PREFETCH_TOP_K = int(os.getenv("PAGE_PREFETCH_TOP_K", "3"))
+_PREFETCH_CONCURRENCY = int(os.getenv("PAGE_PREFETCH_CONCURRENCY", "4"))
+_PREFETCH_TIMEOUT_SECONDS = 15.0
+
+Fetch = Callable[[str, float], str]
+
+
+@dataclass
+class _Page:
+    text: str
+    stored_at: float = field(default_factory=time.monotonic)
+    prefetched: bool = False
+    used: bool = False
+
+
+class PageCache:
+    """Thread-safe LRU cache of page text with a TTL and a byte budget.
+
+    Concurrent requests for the same URL share one fetch.
+    """
+
+    def __init__(self, max_bytes: int = _MAX_BYTES, ttl_seconds: float = _TTL_SECONDS) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._pages: OrderedDict[str, _Page] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, Future[str]] = {}
+        # URLs whose in-flight fetch another read joined: stored as already used.
+        self._joined: set[str] = set()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "inflight_joins": 0,
+            "prefetched": 0,
+            "prefetch_errors": 0,
+            "prefetch_used": 0,
+            "prefetch_wasted": 0,
+        }
+
+    def _lookup(self, url: str) -> _Page | None:
+        """Fresh cached page or None; caller holds the lock."""
+        page = self._pages.get(url)
+        if page is None:
+            return None
+        if time.monotonic() - page.stored_at > self._ttl:
+            self._remove(url)
+            return None
+        return page
+
+    def _remove(self, url: str) -> None:
+        page = self._pages.pop(url)
+        self._bytes -= len(page.text)
+        if page.prefetched and not page.used:
+            self._counters["prefetch_wasted"] += 1
+
+    def _store(self, url: str, text: str, prefetched: bool) -> None:
+        with self._lock:
+            used = url in self._joined
+            self._joined.discard(url)
+            if prefetched and used:
+                self._counters["prefetch_used"] += 1
+            if url in self._pages:
+                self._remove(url)
+            if len(text) > self._max_bytes:
+                return
+            self._pages[url] = _Page(text, prefetched=prefetched, used=used)
+            self._bytes += len(text)
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._pages)))
+
+    def _claim(self, url: str) -> Future[str]:
+        """Register a new in-flight fetch of url; caller holds the lock and checked _inflight."""
+        future: Future[str] = Future()
+        self._inflight[url] = future
+        return future
+
+    def _fetch(
+        self, url: str, future: Future[str], fetch: Fetch, timeout: float, prefetched: bool
+    ) -> str:
+        """Run the fetch claimed by future and settle it for any readers that joined."""
+        try:
+            text = fetch(url, timeout)
+        except BaseException as e:
+            with self._lock:
+                self._joined.discard(url)
+            future.set_exception(e)
+            raise
+        else:
+            self._store(url, text, prefetched)
+            future.set_result(text)
+            return text
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def get(self, url: str, fetch: Fetch, timeout: float) -> str:
+        """Return the page text from the cache, a fetch in flight, or a new fetch.
+
+        Exceptions raised by fetch propagate (also to requests that joined it).
+        """
+        with self._lock:
+            page = self._lookup(url)
+            if page is not None:
+                self._counters["hits"] += 1
+                if page.prefetched and not page.used:
+                    self._counters["prefetch_used"] += 1
+                page.used = True
+                self._pages.move_to_end(url)
+                return page.text
+            future = self._inflight.get(url)
+            if future is None:
+                # Claimed under the same lock as the check, so concurrent
+                # readers of a missing page join this fetch instead of
+                # starting their own.
+                self._counters["misses"] += 1
+                claimed = self._claim(url)
+            else:
+                self._counters["inflight_joins"] += 1
+                self._joined.add(url)
+        if future is None:
+            return self._fetch(url, claimed, fetch, timeout, prefetched=False)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"timed out after {timeout:g}s") from None
+
+    def prefetch(self, url: str, fetch: Fetch, timeout: float = _PREFETCH_TIMEOUT_SECONDS) -> None:
+        """Fetch and cache url unless it is cached or being fetched already; never raises."""
+        with self._lock:
+            if self._lookup(url) is not None or url in self._inflight:
+                return
+            claimed = self._claim(url)
+        try:
+            self._fetch(url, claimed, fetch, timeout, prefetched=True)
+        except Exception as e:  # noqa: BLE001 - a failed prefetch only costs the attempt
+            with self._lock:
+                self._counters["prefetch_errors"] += 1
+            logger.debug("Prefetch of %s failed: %s", url, e)
+            return
+        with self._lock:
+            self._counters["prefetched"] += 1
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            return self._lookup(url) is not None or url in self._inflight
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            pages, size = len(self._pages), self._bytes
+        reads = counters["hits"] + counters["inflight_joins"] + counters["misses"]
+        return {
+            "pages": pages,
+            "bytes": size,
+            "max_bytes": self._max_bytes,
+            **counters,
+            "hit_rate": round((reads - counters["misses"]) / reads, 3) if reads else None,
+            # Share of completed prefetches that a later read actually used.
+            "prefetch_use_rate": (
+                round(counters["prefetch_used"] / counters["prefetched"], 3)
+                if counters["prefetched"]
+                else None
+            ),
+        }
+
+
+class Prefetcher:
+    """Warms a PageCache in the background, grouped by conversation so it can be cancelled."""
+
+    def __init__(
+        self,
+        cache: PageCache,
+        fetch: Fetch,
+        *,
+        top_k: int = _PREFETCH_TOP_K,
+        concurrency: int = _PREFETCH_CONCURRENCY,
+    ) -> None:
+        self._cache = cache
+        self._fetch = fetch
+        self._top_k = top_k
+        self._concurrency = concurrency
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._tasks: dict[str, set[asyncio.Task[None]]] = {}
+        self._scheduled = 0
+        self._cancelled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._top_k > 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._concurrency)
+        return semaphore
+
+    async def _run(self, url: str) -> None:
+        async with self._semaphore():
+            await asyncio.to_thread(self._cache.prefetch, url, self._fetch)
+
+    def schedule(self, key: str, urls: Iterable[str | None]) -> int:
+        """Prefetch the first top_k new http(s) URLs for conversation key; returns how many.
+
+        Must be called from the event loop.
+        """
+        if not self.enabled:
+            return 0
+        picked: list[str] = []
+        for url in urls:
+            if len(picked) == self._top_k:
+                break
+            if url and url.startswith(("http://", "https://")) and url not in picked:
+                picked.append(url)
+        tasks = self._tasks.setdefault(key, set())
+        started = 0
+        for url in picked:
+            if self._cache.contains(url):
+                continue
+            task = asyncio.get_running_loop().create_task(self._run(url))
+            tasks.add(task)
+            task.add_done_callback(lambda t, key=key: self._discard(key, t))
+            started += 1
+        self._scheduled += started
+        return started
+
+    def _discard(self, key: str, task: asyncio.Task[None]) -> None:
+        tasks = self._tasks.get(key)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._tasks[key]
+
+    def cancel(self, key: str) -> None:
+        """Cancel the prefetches of a conversation (e.g. when its session ends); best-effort.
+
+        Prefetches still queued for the semaphore never start. One already
+        fetching runs in a worker thread that cannot be interrupted: it stops
+        waiting, but the fetch finishes (bounded by its timeout) and is cached.
+        """
+        for task in list(self._tasks.pop(key, ())):
+            if not task.done():
+                task.cancel()
+                self._cancelled += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "top_k": self._top_k,
+            "scheduled": self._scheduled,
+            "cancelled": self._cancelled,
+            "pending": sum(len(t) for t in self._tasks.values()),
+        }
@@ -0,0 +1,195 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deduplicated per-session paper store referenced from session state.
+
+Search tools put full paper records here and keep only compact references
+(paperId, title, year) in session state, so state stays small when it is
+serialized on every update and copied into AgentTool sub-sessions. Agents
+resolve full records on demand with the get_paper_details tool.
+
+The store id lives in session state under PAPER_STORE_STATE_KEY, which
+AgentTool copies into its sub-sessions, so the coordinator and every sub-agent
+of one conversation share a store.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+PAPER_STORE_STATE_KEY = "paper_store_id"
+RECENT_PAPERS_STATE_KEY = "recent_citing_papers"
+
+_MAX_STORES = int(os.getenv("PAPER_STORE_MAX_SESSIONS", "256"))
+_MAX_PAPERS_PER_STORE = int(os.getenv("PAPER_STORE_MAX_PAPERS", "2000"))
+# Compact references kept in session state (newest first).
+_MAX_RECENT_REFS = 50
+_SUMMARY_ABSTRACT_CHARS = 300
+_SUMMARY_MAX_AUTHORS = 3
+
+
+class StateContext(Protocol):
+    """Anything exposing ADK session state, e.g. ToolContext or CallbackContext."""
+
+    @property
+    def state(self) -> Any: ...
+
+
+class PaperStore:
+    """Papers of one session keyed by paperId; repeated papers are merged, not duplicated."""
+
+    def __init__(self, max_papers: int = _MAX_PAPERS_PER_STORE) -> None:
+        self._max_papers = max_papers
+        self._papers: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, papers: Iterable[dict[str, Any]]) -> list[str]:
+        """Store papers (merging fields into known ones); return their paperIds in order."""
+        ids: list[str] = []
+        with self._lock:
+            for paper in papers:
+                paper_id = paper.get("paperId")
+                if not paper_id:
+                    continue
+                known = self._papers.get(paper_id)
+                if known is None:
+                    self._papers[paper_id] = dict(paper)
+                else:
+                    known.update({k: v for k, v in paper.items() if v is not None})
+                    self._papers.move_to_end(paper_id)
+                ids.append(paper_id)
+            while len(self._papers) > self._max_papers:
+                self._papers.popitem(last=False)
+        return ids
+
+    def get(self, paper_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            paper = self._papers.get(paper_id)
+            return dict(paper) if paper is not None else None
+
+    def recent(self, limit: int) -> list[dict[str, Any]]:
+        """Up to limit stored papers, most recently added or updated first."""
+        with self._lock:
+            return [dict(p) for p in list(reversed(self._papers.values()))[:limit]]
+
+    def __contains__(self, paper_id: object) -> bool:
+        with self._lock:
+            return paper_id in self._papers
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._papers)
+
+
+class PaperStoreRegistry:
+    """Least-recently-used set of PaperStores, one per conversation."""
+
+    def __init__(
+        self, max_stores: int = _MAX_STORES, max_papers: int = _MAX_PAPERS_PER_STORE
+    ) -> None:
+        self._max_stores = max_stores
+        self._max_papers = max_papers
+        self._stores: OrderedDict[str, PaperStore] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, store_id: str) -> PaperStore:
+        with self._lock:
+            store = self._stores.get(store_id)
+            if store is None:
+                store = self._stores[store_id] = PaperStore(self._max_papers)
+                while len(self._stores) > self._max_stores:
+                    self._stores.popitem(last=False)
+            else:
+                self._stores.move_to_end(store_id)
+            return store
+
+    def for_context(self, ctx: StateContext | None) -> PaperStore | None:
+        """Return the store referenced by the session state, creating it if needed."""
+        if ctx is None:
+            return None
+        store_id = ctx.state.get(PAPER_STORE_STATE_KEY)
+        if not store_id:
+            store_id = uuid.uuid4().hex
+            ctx.state[PAPER_STORE_STATE_KEY] = store_id
+        return self.get(store_id)
+
+    def drop(self, store_id: str) -> None:
+        with self._lock:
+            self._stores.pop(store_id, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            stores = list(self._stores.values())
+        return {"stores": len(stores), "papers": sum(len(s) for s in stores)}
+
+
+paper_stores = PaperStoreRegistry()
+
+
+def ensure_paper_store(callback_context: StateContext) -> None:
+    """before_agent_callback for the root agent: assign the session's store id up front.
+
+    Doing it before any tool runs means parallel AgentTool calls all inherit the
+    same id instead of each creating their own.
+    """
+    paper_stores.for_context(callback_context)
+
+
+def summarize_paper(paper: dict[str, Any]) -> dict[str, Any]:
+    """Compact view of a paper record: truncated abstract, first authors, no nested blobs."""
+    summary: dict[str, Any] = {}
+    for key, value in paper.items():
+        if value is None:
+            continue
+        if key == "abstract" and isinstance(value, str):
+            if len(value) > _SUMMARY_ABSTRACT_CHARS:
+                value = value[:_SUMMARY_ABSTRACT_CHARS].rstrip() + "..."
+        elif key == "authors" and isinstance(value, list):
+            names = [a.get("name", "") for a in value if isinstance(a, dict)]
+            value = names[:_SUMMARY_MAX_AUTHORS]
+            if len(names) > _SUMMARY_MAX_AUTHORS:
+                value.append("et al.")
+        elif key == "openAccessPdf" and isinstance(value, dict):
+            value = value.get("url")
+        elif key == "externalIds" and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k in ("DOI", "ArXiv")}
+        elif isinstance(value, (list, dict)):
+            continue
+        summary[key] = value
+    return summary
+
+
+def remember_papers(ctx: StateContext | None, papers: list[dict[str, Any]]) -> None:
+    """Store papers for the session and put compact references into session state."""
+    store = paper_stores.for_context(ctx)
+    if store is None or ctx is None:
+        return
+    store.add(papers)
+    new_refs = [
+        {"paperId": p["paperId"], "title": p.get("title"), "year": p.get("year")}
+        for p in papers
+        if p.get("paperId")
+    ]
+    seen = {ref["paperId"] for ref in new_refs}
+    previous = [
+        ref
+        for ref in ctx.state.get(RECENT_PAPERS_STATE_KEY) or []
+        if isinstance(ref, dict) and ref.get("paperId") not in seen
+    ]
+    ctx.state[RECENT_PAPERS_STATE_KEY] = (new_refs + previous)[:_MAX_RECENT_REFS]
@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Query-relevant passage selection for fetched pages.
+
+Instead of the head of a long page, fetch tools can return the passages that
+best match the caller's question: the text is split into paragraph-sized
+chunks, the chunks are ranked with BM25 against the query, and the best ones
+that fit the character budget are returned in page order.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+# Target chunk size (chars); paragraphs are merged up to it and split beyond it.
+_PASSAGE_CHARS = 1200
+_PASSAGE_SEPARATOR = "\n\n[...]\n\n"
+
+# Standard Okapi BM25 parameters.
+_K1 = 1.5
+_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "were",
+    "what", "which", "with", "does", "do", "did", "can", "about", "into", "than", "then", "there",
+    "these", "those", "they", "we", "our", "you", "your", "i",
+})
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _pieces(paragraph: str, size: int) -> list[str]:
+    """Split a paragraph longer than size at sentence ends (hard cuts for long sentences)."""
+    pieces: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(paragraph):
+        while len(sentence) > size:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:size])
+            sentence = sentence[size:]
+        if current and len(current) + 1 + len(sentence) > size:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(text: str, size: int = _PASSAGE_CHARS) -> list[str]:
+    """Split text into chunks of at most size chars along paragraph and sentence boundaries."""
+    size = max(1, size)
+    passages: list[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for piece in _pieces(paragraph, size) if len(paragraph) > size else [paragraph]:
+            if current and len(current) + 2 + len(piece) > size:
+                passages.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def bm25_scores(passages: list[str], query: str) -> list[float]:
+    """Okapi BM25 score of each passage for query (0 for passages sharing no query term)."""
+    terms = set(_tokens(query))
+    docs = [Counter(_tokens(p)) for p in passages]
+    if not terms or not docs:
+        return [0.0] * len(passages)
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    idf = {}
+    for term in terms:
+        df = sum(1 for d in docs if term in d)
+        idf[term] = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+    scores = []
+    for doc in docs:
+        norm = _K1 * (1 - _B + _B * sum(doc.values()) / avg_len)
+        scores.append(
+            sum(idf[t] * doc[t] * (_K1 + 1) / (doc[t] + norm) for t in terms if t in doc)
+        )
+    return scores
+
+
+def select_passages(text: str, query: str, max_chars: int) -> str:
+    """Return the passages of text most relevant to query, in page order, within max_chars.
+
+    Args:
+        text: Full extracted page text.
+        query: The question or topic the caller is reading for.
+        max_chars: Character budget for the passages and separators (the one-line
+            header comes on top).
+
+    Returns:
+        The text itself if it fits; otherwise the best-scoring passages under a
+        one-line header saying how many were kept. If no passage matches the
+        query, the head of the text is returned instead. Empty for max_chars < 1.
+    """
+    if max_chars < 1:
+        return ""
+    if len(text) <= max_chars:
+        return text
+    passages = split_passages(text, min(_PASSAGE_CHARS, max_chars))
+    scores = bm25_scores(passages, query)
+    ranked = sorted(
+        (i for i, s in enumerate(scores) if s > 0), key=lambda i: scores[i], reverse=True
+    )
+    if not ranked:
+        return text[:max_chars] + "\n\n[...]"
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        cost = len(passages[i]) + (len(_PASSAGE_SEPARATOR) if chosen else 0)
+        if used + cost <= max_chars:
+            chosen.append(i)
+            used += cost
+    chosen.sort()
+    header = f"[{len(chosen)} of {len(passages)} passages most relevant to the query]\n\n"
+    return header + _PASSAGE_SEPARATOR.join(passages[i] for i in chosen)
@@ -0,0 +1,91 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Progress reporting from long-running tools.
+
+Tools report through a ProgressReporter while they work (papers found so far, pages
+fetched, ...). The AG-UI server installs a sink for the duration of each run
+(see academic_research.util.agui) and streams the reports to the client as
+CUSTOM events, so the UI can render partial results before the tool returns,
+including for tools running inside AgentTool sub-agents whose output the
+client otherwise only sees at the end.
+
+Outside an AG-UI run (tests, adk web, eval) no sink is installed and
+reporting is a no-op. The sink travels in a context variable, so it
+reaches tools run by asyncio tasks and asyncio.to_thread workers alike.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+PROGRESS_EVENT_NAME = "tool_progress"
+
+# Progress reports from one tool call closer together than this are dropped,
+# except for the final one (done=True).
+_MIN_INTERVAL_SECONDS = 0.25
+
+ProgressSink = Callable[[dict[str, Any]], None]
+
+_sink: ContextVar[ProgressSink | None] = ContextVar("progress_sink", default=None)
+
+
+@contextmanager
+def progress_sink(sink: ProgressSink) -> Iterator[None]:
+    """Deliver progress reported in this context (and the tasks/threads it starts) to sink."""
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+class ProgressReporter:
+    """Reports progress for one tool call, rate-limited to one update per _MIN_INTERVAL_SECONDS.
+
+    Create it in the tool's own context, then call it as often as useful; it
+    can be called from worker threads.
+    """
+
+    def __init__(self, tool: str, tool_context: Any = None) -> None:
+        self._tool = tool
+        self._call_id = getattr(tool_context, "function_call_id", None)
+        self._sink = _sink.get()
+        self._last = 0.0
+
+    def __call__(self, message: str, *, done: bool = False, **data: Any) -> None:
+        """Send a progress update.
+
+        Args:
+            message: Short human-readable status, e.g. "Fetched 3 of 10 pages".
+            done: True for the tool's final update (never rate-limited).
+            **data: JSON-serializable details such as counts or partial results.
+        """
+        if self._sink is None:
+            return
+        now = time.monotonic()
+        if not done and now - self._last < _MIN_INTERVAL_SECONDS:
+            return
+        self._last = now
+        report: dict[str, Any] = {"tool": self._tool, "message": message, "done": done, **data}
+        if self._call_id:
+            report["toolCallId"] = self._call_id
+        try:
+            self._sink(report)
+        except RuntimeError:  # Event loop already closed: the run is over.
+            self._sink = None
@@ -16,11 +16,13 @@
 
 from __future__ import annotations
 
+from functools import cache
 from pathlib import Path
 
 _PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
 
 
+@cache
 def load_prompt(name: str) -> str:
     """Load prompt template by name.
 
@@ -40,3 +42,15 @@ def load_prompt(name: str) -> str:
     if not path.exists():
         raise FileNotFoundError(f"Prompt file not found: {path}")
     return path.read_text(encoding="utf-8").strip()
+
+
+def preload_prompts() -> list[str]:
+    """Read every prompt file into the load_prompt cache; returns the names loaded."""
+    names = [
+        f"{path.parent.name}/{path.stem}"
+        for path in sorted(_PROMPTS_DIR.glob("*/*.txt"))
+        if path.stem in ("instruction", "description")
+    ]
+    for name in names:
+        load_prompt(name)
+    return names
@@ -0,0 +1,337 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Byte-budgeted in-memory ADK session service that spills idle sessions to disk.
+
+InMemorySessionService keeps every session (with its full event history)
+until the AG-UI session timeout deletes it, so memory grows with traffic.
+BoundedSessionService tracks the approximate serialized size of each session
+and, when the resident total exceeds its budget, writes the least recently
+used idle sessions to local disk and drops their events from memory.
+
+A spilled session keeps a small stub (id, state, timestamps; no events) in
+memory so list_sessions, which AG-UI uses to find a thread's session, still
+sees it. get_session answers from the stub too, so the AG-UI expiry sweep
+(which reads every session every few minutes) neither touches the disk nor
+pulls sessions back into memory; only a read with a GetSessionConfig, which
+asks for events, loads the file. Appending an event restores the session and
+fills in the history of the stub the caller holds, which is how an ADK run
+picks up a spilled session: it reads it and appends the new message first.
+
+Recency is updated by create_session and append_event only, never by reads,
+so a sweep does not make idle sessions look active.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Any
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+logger = logging.getLogger(__name__)
+
+_MAX_BYTES = int(float(os.getenv("SESSION_STORE_MAX_MB", "512")) * 1024 * 1024)
+# Sessions used more recently than this are never spilled (they are likely mid-run).
+_IDLE_SECONDS = float(os.getenv("SESSION_STORE_IDLE_SECONDS", "60"))
+_SPILL_DIR = os.getenv(
+    "SESSION_SPILL_DIR", os.path.join(tempfile.gettempdir(), "academic_research_sessions")
+)
+
+# Spill files live in this subdirectory of SESSION_SPILL_DIR, which the service owns.
+_SPILL_SUBDIR = "bounded_sessions"
+_SPILL_FILE_RE = re.compile(r"^[0-9a-f]{64}\.json(\.tmp)?$")
+
+_Key = tuple[str, str, str]  # (app_name, user_id, session_id)
+
+
+class _Entry:
+    __slots__ = ("last_access", "size", "version")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.last_access = time.monotonic()
+        self.version = 0
+
+    def touch(self, added: int = 0) -> None:
+        self.size += added
+        self.last_access = time.monotonic()
+        self.version += 1
+
+
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class BoundedSessionService(InMemorySessionService):
+    """InMemorySessionService with a memory budget and LRU spill-to-disk.
+
+    on_delete, if given, is called with a session (a stub without events if it
+    is spilled) right before it is deleted, to release resources tied to it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = _MAX_BYTES,
+        idle_seconds: float = _IDLE_SECONDS,
+        spill_dir: str = _SPILL_DIR,
+        on_delete: Callable[[Session], None] | None = None,
+    ) -> None:
+        super().__init__()
+        self._max_bytes = max_bytes
+        self._idle_seconds = idle_seconds
+        self._spill_dir = os.path.join(spill_dir, _SPILL_SUBDIR)
+        self._on_delete = on_delete
+        # Resident sessions, least recently used first.
+        self._resident: OrderedDict[_Key, _Entry] = OrderedDict()
+        # Spilled sessions: stub without events, and size on disk.
+        self._spilled: dict[_Key, tuple[Session, int]] = {}
+        self._evicting = False
+        self._counters = {
+            "spills": 0,
+            "restores": 0,
+            "disk_reads": 0,
+            "stub_reads": 0,
+            "spill_errors": 0,
+        }
+        os.makedirs(self._spill_dir, exist_ok=True)
+        self._remove_stale_spill_files()
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _remove_stale_spill_files(self) -> None:
+        """Delete spill files of a previous process: they have no stubs and can never be found.
+
+        Only files named like our own spill files are removed, never anything else.
+        """
+        for name in os.listdir(self._spill_dir):
+            if _SPILL_FILE_RE.match(name):
+                with suppress(OSError):
+                    os.remove(os.path.join(self._spill_dir, name))
+
+    def _path(self, key: _Key) -> str:
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return os.path.join(self._spill_dir, f"{digest}.json")
+
+    def _stored(self, key: _Key) -> Session | None:
+        app_name, user_id, session_id = key
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    def _admit(self, key: _Key, session: Session, size: int) -> None:
+        app_name, user_id, session_id = key
+        self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[session_id] = session
+        self._resident[key] = _Entry(size)
+
+    def _touch(self, key: _Key, added: int = 0) -> None:
+        entry = self._resident.get(key)
+        if entry is not None:
+            entry.touch(added)
+            self._resident.move_to_end(key)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(e.size for e in self._resident.values())
+
+    # -- spill / restore ---------------------------------------------------
+
+    def _write(self, key: _Key, data: str) -> None:
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _read(self, key: _Key) -> Session:
+        with open(self._path(key), encoding="utf-8") as f:
+            return Session.model_validate_json(f.read())
+
+    async def _evict(self) -> None:
+        """Spill least recently used idle sessions until the resident total fits the budget."""
+        if self._evicting:
+            return
+        self._evicting = True
+        try:
+            now = time.monotonic()
+            total = self.resident_bytes
+            for key in list(self._resident):
+                if total <= self._max_bytes:
+                    break
+                entry = self._resident.get(key)
+                session = self._stored(key)
+                if entry is None or session is None:
+                    continue
+                if now - entry.last_access < self._idle_seconds:
+                    break  # LRU order: every later session is more recent.
+                version = entry.version
+                data = session.model_dump_json()
+                try:
+                    await asyncio.to_thread(self._write, key, data)
+                except OSError as e:
+                    self._counters["spill_errors"] += 1
+                    logger.warning("Could not spill session %s: %s", key[2], e)
+                    break
+                if self._resident.get(key) is not entry or entry.version != version:
+                    continue  # Used while being written; the file is rewritten next time.
+                stub = copy.copy(session)
+                stub.events = []
+                app_name, user_id, session_id = key
+                del self.sessions[app_name][user_id][session_id]
+                del self._resident[key]
+                self._spilled[key] = (stub, len(data))
+                self._counters["spills"] += 1
+                total -= entry.size
+            if total > self._max_bytes:
+                logger.info(
+                    "Session store over budget (%d > %d bytes); remaining sessions are active",
+                    total,
+                    self._max_bytes,
+                )
+        finally:
+            self._evicting = False
+
+    async def _load_spilled(self, key: _Key) -> Session | None:
+        if key not in self._spilled:
+            return None
+        try:
+            session = await asyncio.to_thread(self._read, key)
+        except (OSError, ValueError) as e:
+            logger.error("Could not read spilled session %s: %s", key[2], e)
+            return None
+        self._counters["disk_reads"] += 1
+        return session
+
+    async def _restore(self, key: _Key) -> None:
+        """Bring a spilled session back into memory."""
+        session = await self._load_spilled(key)
+        # Re-check: another coroutine may have restored or deleted it meanwhile.
+        if session is None or key not in self._spilled:
+            return
+        _, size = self._spilled.pop(key)
+        self._admit(key, session, size)
+        self._counters["restores"] += 1
+        with suppress(OSError):
+            os.remove(self._path(key))
+
+    # -- BaseSessionService ------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        if session_id and (app_name, user_id, session_id.strip()) in self._spilled:
+            await self._restore((app_name, user_id, session_id.strip()))
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._resident[key] = _Entry(len(session.model_dump_json(exclude_none=True)))
+        await self._evict()
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        key = (app_name, user_id, session_id)
+        if key in self._spilled and config is None:
+            # E.g. expiry checks: id, state and last_update_time are all in the stub.
+            self._counters["stub_reads"] += 1
+            stub = copy.deepcopy(self._spilled[key][0])
+            return self._merge_state(app_name, user_id, stub)
+        if key in self._spilled:
+            session = await self._load_spilled(key)
+            if session is None:
+                return None
+            # Serve the read from disk without re-admitting; apply config on a
+            # temporary service holding just this session.
+            view = InMemorySessionService()
+            view.sessions = {app_name: {user_id: {session_id: session}}}
+            view.app_state, view.user_state = self.app_state, self.user_state
+            return await view.get_session(
+                app_name=app_name, user_id=user_id, session_id=session_id, config=config
+            )
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str | None = None
+    ) -> ListSessionsResponse:
+        response = await super().list_sessions(app_name=app_name, user_id=user_id)
+        for (stub_app, stub_user, _), (stub, _) in self._spilled.items():
+            if stub_app == app_name and (user_id is None or stub_user == user_id):
+                response.sessions.append(
+                    self._merge_state(stub_app, stub_user, copy.deepcopy(stub))
+                )
+        return response
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        session = self._spilled[key][0] if key in self._spilled else self._stored(key)
+        if session is not None and self._on_delete is not None:
+            try:
+                self._on_delete(session)
+            except Exception:
+                logger.exception("on_delete failed for session %s", session_id)
+        if self._spilled.pop(key, None) is not None:
+            with suppress(OSError):
+                os.remove(self._path(key))
+        self._resident.pop(key, None)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._spilled:
+            await self._restore(key)
+            stored = self._stored(key)
+            if stored is not None and not session.events:
+                # The caller holds a stub from get_session; give it the history.
+                session.events = copy.deepcopy(stored.events)
+        event = await super().append_event(session, event)
+        if not event.partial:
+            self._touch(key, _event_size(event))
+            await self._evict()
+        return event
+
+    def stats(self) -> dict[str, Any]:
+        """Memory gauges for /debug/memory."""
+        return {
+            "resident_sessions": len(self._resident),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self._max_bytes,
+            "spilled_sessions": len(self._spilled),
+            "spilled_bytes": sum(size for _, size in self._spilled.values()),
+            **self._counters,
+        }
@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup phase profiling for the AG-UI server (import and construction timings)."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+
+class StartupProfiler:
+    """Records named startup phases and milestones relative to process start.
+
+    Phases measure wall time and the number of modules imported while they ran,
+    so the report shows where cold-start time goes (e.g. importing google.adk vs
+    constructing agents). Milestones mark one-off events such as the first
+    successful /health response.
+    """
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases: list[dict[str, Any]] = []
+        self._milestones: dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        """Seconds since the profiler was created (approximately process start)."""
+        return time.perf_counter() - self._t0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase, e.g. ``with startup_profiler.phase("import ag_ui_adk"):``."""
+        start = time.perf_counter()
+        modules_before = len(sys.modules)
+        error: str | None = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry: dict[str, Any] = {
+                "name": name,
+                "start_s": round(start - self._t0, 4),
+                "duration_s": round(time.perf_counter() - start, 4),
+                "modules_imported": len(sys.modules) - modules_before,
+            }
+            if error:
+                entry["error"] = error
+            with self._lock:
+                self._phases.append(entry)
+
+    def mark(self, name: str) -> None:
+        """Record a milestone the first time it happens; later calls are ignored."""
+        with self._lock:
+            self._milestones.setdefault(name, round(self.elapsed(), 4))
+
+    def report(self) -> dict[str, Any]:
+        """Return phases, milestones and loaded module count as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "uptime_s": round(self.elapsed(), 4),
+                "modules_loaded": len(sys.modules),
+                "phases": list(self._phases),
+                "milestones": dict(self._milestones),
+            }
+
+
+# Process-wide profiler; main.py creates it before any heavy import.
+startup_profiler = StartupProfiler()
@@ -12,18 +12,48 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Shared tools for academic research agents, e.g. URL fetching."""
+"""Shared tools for academic research agents, e.g. URL fetching.
+
+Fetched page text goes through a PageCache that the search tools warm by
+prefetching their top hits (see academic_research.util.page_cache).
+"""
 
 from __future__ import annotations
 
+import asyncio
 import html
+import json
+import os
 import re
+import time
+from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+from academic_research.util.cancellation import RunCancelled, current_budget, tool_timeout
+from academic_research.util.page_cache import PageCache, Prefetcher
+from academic_research.util.passages import select_passages
+from academic_research.util.progress import ProgressReporter
+
 # Max content size to avoid overwhelming the LLM (chars).
 _MAX_CONTENT_CHARS = 50000
+_FETCH_TIMEOUT_SECONDS = 15.0
+_FETCH_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (compatible; AcademicResearchBot/1.0; +https://github.com)"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/json,text/plain,*/*",
+}
+_TRUNCATION_MARKER = "\n\n[... truncated ...]"
+# Per-page budget when a query selects passages instead of keeping the head.
+_QUERY_MAX_CHARS = 8000
+
+# fetch_urls limits: URLs per call, parallel fetches overall and per host (so
+# one publisher is not hit with the whole batch at once).
+_MAX_URLS_PER_CALL = 20
+_FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+_FETCH_PER_HOST_CONCURRENCY = int(os.getenv("FETCH_PER_HOST_CONCURRENCY", "2"))
 
 
 def _html_to_text(html_str: str) -> str:
@@ -45,52 +75,240 @@ def _html_to_text(html_str: str) -> str:
     return text.strip()
 
 
-def fetch_url(url: str, *, max_chars: int = _MAX_CONTENT_CHARS) -> str:
+class FetchError(Exception):
+    """A URL could not be fetched or its content type is unsupported.
+
+    The message is the error string returned to the model.
+    """
+
+
+def _fetch_text(url: str, timeout: float = _FETCH_TIMEOUT_SECONDS) -> str:
+    """Fetch a URL and return its readable text (untruncated); raises FetchError."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        raise FetchError(
+            f"Error: Only http/https URLs are supported. Got scheme: {parsed.scheme}"
+        )
+
+    req = Request(url, headers=_FETCH_HEADERS)
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            content_type = resp.headers.get("Content-Type", "").lower()
+            raw = resp.read().decode("utf-8", errors="replace")
+    except HTTPError as e:
+        raise FetchError(f"Error fetching URL: HTTP {e.code} {e.reason}") from e
+    except URLError as e:
+        raise FetchError(f"Error fetching URL: {e.reason}") from e
+    except Exception as e:
+        raise FetchError(f"Error fetching URL: {e}") from e
+
+    if "application/pdf" in content_type:
+        raise FetchError(
+            "Error: PDF content is not supported. Use the URL for an HTML or text page instead."
+        )
+    if "text/html" in content_type or "application/xhtml" in content_type:
+        return _html_to_text(raw)
+    return raw
+
+
+page_cache = PageCache()
+prefetcher = Prefetcher(page_cache, _fetch_text)
+
+
+def _cached_fetch_text(url: str, timeout: float) -> str:
+    """_fetch_text through the page cache (joining a prefetch already in flight)."""
+    try:
+        return page_cache.get(url, _fetch_text, timeout)
+    except TimeoutError as e:
+        raise FetchError(f"Error fetching URL: {e}") from e
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) > max_chars:
+        return text[:max_chars] + _TRUNCATION_MARKER
+    return text
+
+
+async def fetch_url(url: str, query: str = "", *, max_chars: int = _MAX_CONTENT_CHARS) -> str:
     """Fetch content from a URL for reading (e.g. paper abstracts, landing pages).
 
     Retrieves the raw response and, for HTML pages, extracts readable text.
-    PDFs and other binary formats are not supported.
+    PDFs and other binary formats are not supported. For long pages such as
+    full papers, pass query: only the passages most relevant to it are
+    returned, which is much shorter than the whole page.
 
     Args:
         url: The full URL to fetch (http or https).
+        query: Optional question or topic you are reading the page for, e.g.
+            "evaluation datasets and results". When given, returns the best
+            matching passages (about 8000 characters) instead of the start of
+            the page.
         max_chars: Maximum number of characters to return. Default 50000.
 
     Returns:
         The fetched content as text. For HTML, returns extracted text. Truncated
-        if longer than max_chars. On error, returns an error message string.
+        if longer than max_chars; with a query, the most relevant passages in
+        page order. On error, returns an error message string.
     """
-    parsed = urlparse(url)
-    if parsed.scheme not in ("http", "https"):
-        return f"Error: Only http/https URLs are supported. Got scheme: {parsed.scheme}"
+    if max_chars < 1:
+        return f"Error: max_chars must be at least 1, got {max_chars}"
+    # Async so the blocking fetch runs in a worker thread, off the event loop,
+    # and the tool call can be cancelled with its run.
+    try:
+        text = await asyncio.to_thread(
+            _cached_fetch_text, url, tool_timeout(_FETCH_TIMEOUT_SECONDS)
+        )
+    except FetchError as e:
+        return str(e)
+    except RunCancelled as e:
+        return f"Error: {e}"
+    if query.strip():
+        return await asyncio.to_thread(
+            select_passages, text, query, min(max_chars, _QUERY_MAX_CHARS)
+        )
+    return _truncate(text, max_chars)
 
-    headers: dict[str, str] = {
-        "User-Agent": (
-            "Mozilla/5.0 (compatible; AcademicResearchBot/1.0; +https://github.com)"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/json,text/plain,*/*",
-    }
-    req = Request(url, headers=headers)
 
-    try:
-        with urlopen(req, timeout=15) as resp:
-            content_type = resp.headers.get("Content-Type", "").lower()
-            raw = resp.read().decode("utf-8", errors="replace")
+def _split_budget(lengths: list[int], budget: int) -> list[int]:
+    """Share a character budget among texts: short texts keep everything, long ones split the rest.
 
-        if "application/pdf" in content_type:
-            return "Error: PDF content is not supported. Use the URL for an HTML or text page instead."
+    Returns the number of characters each text may keep.
+    """
+    shares = [0] * len(lengths)
+    remaining = budget
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending:
+        fair = remaining // len(pending)
+        i = pending[0]
+        if lengths[i] <= fair:
+            shares[i] = lengths[i]
+            remaining -= lengths[i]
+            pending.pop(0)
+            continue
+        # Every remaining text is longer than an equal share: split evenly.
+        for i in pending:
+            shares[i] = fair
+        break
+    return shares
+
+
+async def fetch_urls(
+    urls: list[str],
+    max_total_chars: int = 100000,
+    deadline_seconds: float = 30.0,
+    query: str = "",
+    tool_context: Any = None,
+) -> str:
+    """Fetch several URLs concurrently (e.g. the landing pages of many papers).
+
+    Use this instead of repeated fetch_url calls when you need to read more
+    than one page. Pages are fetched in parallel (a few at a time per host)
+    and their text shares one character budget: short pages are returned in
+    full, long pages are truncated evenly. URLs that fail or do not finish
+    before the deadline get an error instead of text. PDFs are not supported.
+    With a query, each page is cut down to its passages most relevant to it
+    first, which keeps long pages short.
+
+    Args:
+        urls: Full http(s) URLs to fetch, at most 20.
+        max_total_chars: Total characters of text returned across all URLs.
+            Default 100000.
+        deadline_seconds: Overall time limit for the whole call. Default 30.
+        query: Optional question or topic you are reading the pages for. When
+            given, each page contributes its best matching passages (about
+            8000 characters) instead of its start.
 
-        if "text/html" in content_type or "application/xhtml" in content_type:
-            text = _html_to_text(raw)
+    Returns:
+        JSON string with a results array in input order; each entry has url and
+        either text (plus truncated: true/false) or error.
+    """
+    unique = list(dict.fromkeys(urls))
+    skipped = unique[_MAX_URLS_PER_CALL:]
+    unique = unique[:_MAX_URLS_PER_CALL]
+    # The call's deadline never extends past the run's own deadline.
+    run_budget = current_budget()
+    remaining = run_budget.remaining() if run_budget is not None else None
+    if remaining is not None:
+        deadline_seconds = min(deadline_seconds, remaining)
+    deadline = time.monotonic() + max(1.0, deadline_seconds)
+
+    overall = asyncio.Semaphore(_FETCH_CONCURRENCY)
+    per_host: dict[str, asyncio.Semaphore] = {}
+    progress = ProgressReporter("fetch_urls", tool_context)
+    finished = 0
+
+    async def fetch_one(url: str) -> str:
+        nonlocal finished
+        host = urlparse(url).netloc.lower()
+        host_limit = per_host.setdefault(host, asyncio.Semaphore(_FETCH_PER_HOST_CONCURRENCY))
+        async with host_limit, overall:
+            timeout = min(_FETCH_TIMEOUT_SECONDS, deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            try:
+                return await asyncio.to_thread(_cached_fetch_text, url, timeout)
+            except FetchError:
+                if time.monotonic() >= deadline:  # socket timeout cut short by the deadline
+                    raise asyncio.TimeoutError from None
+                raise
+            finally:
+                finished += 1
+                progress(
+                    f"Fetched {finished} of {len(unique)} pages",
+                    finished=finished,
+                    total=len(unique),
+                    url=url,
+                )
+
+    tasks = {url: asyncio.create_task(fetch_one(url)) for url in unique}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+    texts: dict[str, str] = {}
+    errors: dict[str, str] = {
+        url: f"Error: Skipped, at most {_MAX_URLS_PER_CALL} URLs per call" for url in skipped
+    }
+    for url, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            errors[url] = f"Error: Deadline of {deadline_seconds:g}s exceeded"
+        elif isinstance(task.exception(), asyncio.TimeoutError):
+            errors[url] = f"Error: Deadline of {deadline_seconds:g}s exceeded"
+        elif task.exception() is not None:
+            errors[url] = str(task.exception())
         else:
-            text = raw
+            texts[url] = task.result()
+    if query.strip() and texts:
+        # Ranking a long page takes a fraction of a second; keep it off the event loop.
+        selected = await asyncio.gather(
+            *(
+                asyncio.to_thread(select_passages, text, query, _QUERY_MAX_CHARS)
+                for text in texts.values()
+            )
+        )
+        texts = dict(zip(texts, selected))
 
-        if len(text) > max_chars:
-            text = text[:max_chars] + "\n\n[... truncated ...]"
-        return text
+    fetched = list(texts)
+    shares = _split_budget([len(texts[u]) for u in fetched], max(0, max_total_chars))
+    shares_by_url = dict(zip(fetched, shares))
 
-    except HTTPError as e:
-        return f"Error fetching URL: HTTP {e.code} {e.reason}"
-    except URLError as e:
-        return f"Error fetching URL: {e.reason}"
-    except Exception as e:
-        return f"Error fetching URL: {e}"
+    results: list[dict[str, Any]] = []
+    for url in dict.fromkeys(urls):
+        if url in errors:
+            results.append({"url": url, "error": errors[url]})
+        else:
+            text = texts[url]
+            results.append(
+                {
+                    "url": url,
+                    "text": text[: shares_by_url[url]],
+                    "truncated": shares_by_url[url] < len(text),
+                }
+            )
+    progress(
+        f"Fetched {len(texts)} of {len(results)} pages",
+        done=True,
+        fetched=len(texts),
+        failed=len(errors),
+    )
+    return json.dumps({"results": results}, ensure_ascii=False)
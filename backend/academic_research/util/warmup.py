@@ -0,0 +1,127 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup warm-up: run named steps once and track readiness for the /ready probe."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Delay before re-running a failed required step; doubles per attempt up to the cap.
+_RETRY_BACKOFF_SECONDS = 5.0
+_MAX_RETRY_BACKOFF_SECONDS = 60.0
+
+
+class Warmup:
+    """Runs warm-up steps in order and records their outcome.
+
+    Each step is a sync callable (run in a worker thread) or an async callable.
+    A failing optional step is recorded and skipped, so an outage of e.g.
+    Semantic Scholar does not keep pods out of rotation; a failing (or timed-out)
+    required step keeps the pod unready and is retried with exponential backoff,
+    together with the steps after it, until it succeeds.
+    """
+
+    def __init__(
+        self,
+        steps: dict[str, Callable[[], Any]],
+        *,
+        required: Iterable[str] = (),
+        step_timeout: float = 30.0,
+        retry_backoff: float = _RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self._steps = steps
+        self._required = set(required)
+        self._step_timeout = step_timeout
+        self._retry_backoff = retry_backoff
+        self._state = "pending"
+        self._results: dict[str, dict[str, Any]] = {}
+        self._duration: float | None = None
+        self._attempts = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "done"
+
+    async def _run_step(self, fn: Callable[[], Any]) -> Any:
+        if inspect.iscoroutinefunction(fn):
+            return await asyncio.wait_for(fn(), self._step_timeout)
+        return await asyncio.wait_for(asyncio.to_thread(fn), self._step_timeout)
+
+    async def _run_steps(self, names: list[str]) -> str | None:
+        """Run the named steps in order; returns the failed required step, if any."""
+        for name in names:
+            fn = self._steps[name]
+            step_start = time.perf_counter()
+            entry: dict[str, Any] = {"required": name in self._required}
+            try:
+                detail = await self._run_step(fn)
+                entry["status"] = "ok"
+                if detail is not None:
+                    entry["detail"] = detail
+            except asyncio.TimeoutError:
+                entry["status"] = "error"
+                entry["error"] = f"timed out after {self._step_timeout}s"
+            except Exception as e:  # noqa: BLE001 - any step failure is reported, not raised
+                entry["status"] = "error"
+                entry["error"] = f"{type(e).__name__}: {e}"
+            entry["duration_s"] = round(time.perf_counter() - step_start, 4)
+            self._results[name] = entry
+            if entry["status"] == "error":
+                logger.warning("Warm-up step %r failed: %s", name, entry["error"])
+                if entry["required"]:
+                    return name
+        return None
+
+    async def run(self) -> None:
+        """Run all steps until the required ones succeed; safe alongside request handling.
+
+        Optional steps are run once. From a failed required step on, the
+        remaining steps are re-run after a backoff; cancel the task to stop.
+        """
+        if self._state != "pending":
+            return
+        self._state = "running"
+        start = time.perf_counter()
+        names = list(self._steps)
+        backoff = self._retry_backoff
+        while True:
+            self._attempts += 1
+            failed = await self._run_steps(names)
+            if failed is None:
+                break
+            names = names[names.index(failed) :]
+            self._state = "retrying"
+            logger.warning("Retrying warm-up from step %r in %.1fs", failed, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _MAX_RETRY_BACKOFF_SECONDS)
+            self._state = "running"
+        self._duration = round(time.perf_counter() - start, 4)
+        self._state = "done"
+        logger.info("Warm-up done in %.2fs after %d attempt(s)", self._duration, self._attempts)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else self._state,
+            "duration_s": self._duration,
+            "attempts": self._attempts,
+            "steps": dict(self._results),
+        }
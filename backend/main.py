@@ -19,64 +19,296 @@ so that HTML/React (e.g. CopilotKit) and other AG-UI clients can connect.
 Run: uv run python main.py
 Then open the HTML chat at http://localhost:8080 (serve web/ separately)
 or use any AG-UI client pointing at http://localhost:8000/
+
+Set STARTUP_MODE=lazy to defer the ADK imports and agent construction until the
+first AG-UI request; GET /debug/startup reports where startup time went.
+GET /health is the liveness probe; GET /ready turns 200 once the WARMUP_STEPS
+(agent build, prompt cache, model and Semantic Scholar connections) have run.
+GET /debug/memory reports process RSS, session-store and memory-service gauges;
+GET /debug/page_cache reports fetch-cache and search-hit prefetch metrics.
 """
 
+import asyncio
+import importlib
+import logging
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
 
 import dotenv
-from ag_ui_adk import ADKAgent, add_adk_fastapi_endpoint
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from academic_research.sub_agents.paper_search.tools import warm_connection
+from academic_research.util.cancellation import DisconnectWatcher
+from academic_research.util.paper_store import PAPER_STORE_STATE_KEY, paper_stores
+from academic_research.util.prompts import preload_prompts
+from academic_research.util.startup import startup_profiler
+from academic_research.util.tools import page_cache, prefetcher
+from academic_research.util.warmup import Warmup
+
+logger = logging.getLogger(__name__)
 
 # Load .env from backend directory so GOOGLE_API_KEY etc. are available.
 dotenv.load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-# Initialize AgentOps for trace and cost monitoring when API key is set.
-# See https://docs.agentops.ai/v2/integrations/google_adk
-if os.getenv("AGENTOPS_API_KEY"):
+# "eager" (default): import ADK and build the agent tree at import time.
+# "lazy": serve /health immediately and build everything on the first AG-UI request.
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager").strip().lower()
+
+# Comma-separated warm-up steps run in the background at startup; empty disables.
+WARMUP_STEPS = os.getenv("WARMUP_STEPS", "prompts,agent,model,semantic_scholar")
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "30"))
+
+# Per-run deadline: tools and model calls shrink their timeouts to fit it, and
+# the run is cancelled when it passes (or when the client disconnects).
+RUN_DEADLINE_SECONDS = int(os.getenv("RUN_DEADLINE_SECONDS", "600"))
+
+
+def _rss_bytes() -> int | None:
+    """Resident set size of this process (Linux), or None where unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _init_agentops() -> None:
+    """Initialize AgentOps for trace and cost monitoring when API key is set.
+
+    See https://docs.agentops.ai/v2/integrations/google_adk
+    """
+    if not os.getenv("AGENTOPS_API_KEY"):
+        return
     os.environ.setdefault(
         "AGENTOPS_LOGGING_TO_FILE", "FALSE"
     )  # Avoid PermissionError in containers (no write to /app/agentops.log)
     os.environ.setdefault("AGENTOPS_LOG_LEVEL", "WARNING")
-    import agentops
-    agentops.init(
-        fail_safe=True,  # Do not crash the server if AgentOps has issues
-        instrument_llm_calls=True,  # Track LLM token usage and cost
-        default_tags=["academic_research", "google_adk"],
-    )
+    with startup_profiler.phase("import agentops"):
+        import agentops
+    with startup_profiler.phase("agentops.init"):
+        agentops.init(
+            fail_safe=True,  # Do not crash the server if AgentOps has issues
+            instrument_llm_calls=True,  # Track LLM token usage and cost
+            default_tags=["academic_research", "google_adk"],
+        )
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from academic_research.agent import root_agent as academic_root_agent
+# The agent's BoundedSessionService and ADK memory service, set once build_agui_app() has run.
+session_service: Any = None
+memory_service: Any = None
+
+
+def _memory_service_stats() -> dict[str, int] | None:
+    """Sessions and events held by the in-memory ADK memory service."""
+    if memory_service is None:
+        return None
+    with memory_service._lock:
+        sessions = [
+            events
+            for by_session in memory_service._session_events.values()
+            for events in by_session.values()
+        ]
+    return {"sessions": len(sessions), "events": sum(len(e) for e in sessions)}
+
+
+def _end_conversation(session: Any) -> None:
+    """Release what a conversation holds outside its session once AG-UI deletes it."""
+    store_id = session.state.get(PAPER_STORE_STATE_KEY)
+    if store_id:
+        prefetcher.cancel(store_id)
+        paper_stores.drop(store_id)
+
+
+def build_agui_app() -> FastAPI:
+    """Import ADK, build the agent tree and return an app serving the AG-UI endpoint."""
+    # AgentOps must instrument before the ADK/genai clients are imported.
+    _init_agentops()
+    with startup_profiler.phase("import ag_ui_adk"):
+        from ag_ui_adk import add_adk_fastapi_endpoint
+        from google.adk.memory import InMemoryMemoryService
+
+        from academic_research.util.agui import ResearchADKAgent
+        from academic_research.util.session_store import BoundedSessionService
+    with startup_profiler.phase("import academic_research.agent"):
+        from academic_research.agent import root_agent as academic_root_agent
+
+    global session_service, memory_service
+    with startup_profiler.phase("construct ADKAgent"):
+        # In-memory sessions under a byte budget; idle ones spill to local disk.
+        session_service = BoundedSessionService(on_delete=_end_conversation)
+        # No agent reads ADK memory, and copying every expired session into the
+        # unbounded in-memory service would defeat the session byte budget.
+        memory_service = InMemoryMemoryService()
+        # Wrap the ADK agent with AG-UI middleware (sessions, identity, event protocol);
+        # tool progress is streamed to the client as CUSTOM "tool_progress" events.
+        ag_agent = ResearchADKAgent(
+            adk_agent=academic_root_agent,
+            app_name="academic_research",
+            user_id="default",
+            session_timeout_seconds=3600,
+            execution_timeout_seconds=RUN_DEADLINE_SECONDS,
+            session_service=session_service,
+            memory_service=memory_service,
+            save_session_to_memory_on_cleanup=False,
+            use_in_memory_services=True,
+        )
+        agui_app = FastAPI(title="Academic Research AG-UI endpoint")
+        # Expose the AG-UI / ADK-compatible chat API at "/".
+        # AG-UI clients (e.g. web/index.html or CopilotKit) call this endpoint.
+        add_adk_fastapi_endpoint(agui_app, ag_agent, path="/")
+    startup_profiler.mark("agent_ready")
+    logger.info("AG-UI agent ready: %s", startup_profiler.report())
+    return agui_app
+
+
+class LazyAGUIApp:
+    """ASGI app that builds the AG-UI endpoint on first use.
+
+    The heavy imports and agent construction run in a worker thread so the
+    event loop keeps answering /health while the first request waits. All
+    callers share the one in-flight build: a caller that times out or is
+    cancelled stops waiting without cancelling it (the thread could not be
+    interrupted anyway), and only a failed build is started again.
+    """
+
+    def __init__(self) -> None:
+        self._app: FastAPI | None = None
+        self._build: asyncio.Future[FastAPI] | None = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._app is not None
+
+    async def get_app(self) -> FastAPI:
+        if self._app is None:
+            build = self._build
+            if build is None or (build.done() and (build.cancelled() or build.exception())):
+                build = self._build = asyncio.ensure_future(asyncio.to_thread(build_agui_app))
+            self._app = await asyncio.shield(build)
+        return self._app
 
-# Wrap the ADK agent with AG-UI middleware (sessions, identity, event protocol).
-ag_agent = ADKAgent(
-    adk_agent=academic_root_agent,
-    app_name="academic_research",
-    user_id="default",
-    session_timeout_seconds=3600,
-    use_in_memory_services=True,
-)
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        app = await self.get_app()
+        await app(scope, receive, send)
 
-app = FastAPI(title="Academic Research AG-UI")
 
-# Allow HTML frontend (and CopilotKit) to call this API from another origin.
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+if STARTUP_MODE == "lazy":
+    agui_app: LazyAGUIApp | FastAPI = LazyAGUIApp()
+else:
+    agui_app = build_agui_app()
+
+
+async def _warm_agent() -> None:
+    if isinstance(agui_app, LazyAGUIApp):
+        await agui_app.get_app()
+
+
+async def _import_models() -> Any:
+    # Imported off the event loop: in lazy mode this may be the first google.adk import.
+    return await asyncio.to_thread(importlib.import_module, "academic_research.util.models")
+
+
+async def _warm_model() -> list[str]:
+    models = await _import_models()
+    return await models.warm_models()
+
+
+def _configured_warmup() -> Warmup:
+    available = {
+        "prompts": preload_prompts,
+        "agent": _warm_agent,
+        "model": _warm_model,
+        "semantic_scholar": warm_connection,
+    }
+    steps = {}
+    for name in (n.strip() for n in WARMUP_STEPS.split(",")):
+        if not name:
+            continue
+        if name not in available:
+            logger.warning("Ignoring unknown warm-up step %r", name)
+            continue
+        steps[name] = available[name]
+    return Warmup(steps, required={"agent"}, step_timeout=WARMUP_TIMEOUT_SECONDS)
+
+
+warmup = _configured_warmup()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Warm up in the background so /health (liveness) answers right away.
+    task = asyncio.create_task(warmup.run())
+    yield
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+with startup_profiler.phase("create FastAPI app"):
+    app = FastAPI(title="Academic Research AG-UI", lifespan=lifespan)
+
+    # Allow HTML frontend (and CopilotKit) to call this API from another origin.
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 
 @app.get("/health")
 async def health():
+    startup_profiler.mark("first_health")
     return {"status": "ok"}
 
 
-# Expose the AG-UI / ADK-compatible chat API at "/".
-# AG-UI clients (e.g. web/index.html or CopilotKit) call this endpoint.
-add_adk_fastapi_endpoint(app, ag_agent, path="/")
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness probe: 503 until the warm-up has completed."""
+    if not warmup.ready:
+        response.status_code = 503
+    else:
+        startup_profiler.mark("first_ready")
+    return warmup.report()
+
+
+@app.get("/debug/startup")
+async def startup_report():
+    """Import-time and startup-phase profile of this process."""
+    return {"mode": STARTUP_MODE, **startup_profiler.report()}
+
+
+@app.get("/debug/routing")
+async def routing_report(last: int = 50):
+    """Per-agent model configuration, per-model latency/error stats and recent decisions."""
+    models = await _import_models()
+    return models.model_router.report(last=last)
+
+
+@app.get("/debug/memory")
+async def memory_report():
+    """Memory gauges: process RSS, session and memory services and per-session paper stores."""
+    return {
+        "rss_bytes": _rss_bytes(),
+        "sessions": session_service.stats() if session_service is not None else None,
+        "memory_service": _memory_service_stats(),
+        "paper_stores": paper_stores.stats(),
+    }
+
+
+@app.get("/debug/page_cache")
+async def page_cache_report():
+    """Fetched-page cache hit rate and how many prefetched search hits were actually read."""
+    return {"cache": page_cache.stats(), "prefetch": prefetcher.stats()}
+
+
+# Mounted last so /health, /ready and /debug/* keep priority over the catch-all mount.
+# DisconnectWatcher lets a run notice a closed connection and cancel itself.
+app.mount("/", DisconnectWatcher(agui_app))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,211 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark single-call vs. map-reduce literature synthesis across paper set sizes.
+
+By default model calls are simulated: each call sleeps for
+    overhead + input_tokens / prefill_rate + output_tokens / decode_rate
+(scaled down by --time-scale so the run takes seconds), with token counts
+modelled on the synthesis prompts. The map-reduce side runs the real
+map_reduce / split_batches scheduling from the synthesizer's tools, so
+batching, concurrency limits and merge levels are exercised as in production.
+The simulated times are estimates from this formula, not measurements.
+The map-reduce time includes the agent's final turn, which presents the tool
+result (merged synthesis plus the first comparison rows) as its answer; it is
+also reported separately as final_s.
+
+With --live, both sides call the configured models on synthetic papers
+(GOOGLE_API_KEY must be set; this spends tokens).
+
+Usage:
+    uv run python scripts/bench_map_reduce.py [--sizes 10,25,50,80,100,200,400]
+        [--batch-size 8] [--fanout 4] [--concurrency 16] [--live]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from academic_research.sub_agents.literature_synthesizer import tools
+
+# Token model of the prompts (see prompts/synthesis_*/instruction.txt).
+_TOKENS_PER_PAPER = 350  # title, metadata and an abstract of up to 1500 chars
+_INSTRUCTION_TOKENS = 600
+_ROW_TOKENS = 45  # one comparison-table row
+_SECTIONS_TOKENS = 550  # clusters, findings and gaps of a batch (<400 words)
+_MERGED_TOKENS = 800  # a merged synthesis (<600 words)
+# The agent instruction and the conversation before the final turn.
+_AGENT_CONTEXT_TOKENS = 3000
+
+
+class _SimulatedModel:
+    def __init__(self, overhead: float, prefill: float, decode: float, scale: float) -> None:
+        self.overhead, self.prefill, self.decode, self.scale = overhead, prefill, decode, scale
+
+    async def call(self, input_tokens: int, output_tokens: int) -> None:
+        seconds = self.overhead + input_tokens / self.prefill + output_tokens / self.decode
+        await asyncio.sleep(seconds * self.scale)
+
+
+async def _simulated(
+    size: int, args: argparse.Namespace
+) -> tuple[float, float, float, int, int]:
+    """Return (single_s, map_reduce_s, final_s, calls, levels) in simulated seconds."""
+    scale = args.time_scale
+    model = _SimulatedModel(args.overhead, args.prefill_rate, args.decode_rate, scale)
+
+    start = time.perf_counter()
+    await model.call(
+        _AGENT_CONTEXT_TOKENS + size * _TOKENS_PER_PAPER, _SECTIONS_TOKENS + size * _ROW_TOKENS
+    )
+    single = (time.perf_counter() - start) / scale
+
+    async def summarize(batch: list[int]) -> str:
+        await model.call(
+            _INSTRUCTION_TOKENS + len(batch) * _TOKENS_PER_PAPER,
+            _SECTIONS_TOKENS + len(batch) * _ROW_TOKENS,
+        )
+        return "partial"
+
+    async def merge(partials: list[str]) -> str:
+        await model.call(_INSTRUCTION_TOKENS + len(partials) * _MERGED_TOKENS, _MERGED_TOKENS)
+        return "merged"
+
+    start = time.perf_counter()
+    result = await tools.map_reduce(
+        tools.split_batches(list(range(size)), args.batch_size),
+        summarize,
+        merge,
+        fanout=args.fanout,
+        concurrency=args.concurrency,
+    )
+    final_start = time.perf_counter()
+    table_tokens = min(size, tools._RETURNED_TABLE_ROWS) * _ROW_TOKENS
+    await model.call(
+        _AGENT_CONTEXT_TOKENS + _MERGED_TOKENS + table_tokens, _MERGED_TOKENS + table_tokens
+    )
+    end = time.perf_counter()
+    return (
+        single,
+        (end - start) / scale,
+        (end - final_start) / scale,
+        result.calls + 1,
+        result.levels,
+    )
+
+
+def _synthetic_papers(size: int) -> list[str]:
+    topics = ["retrieval", "distillation", "alignment", "evaluation", "efficiency", "robustness"]
+    return [
+        tools._format_paper(
+            i + 1,
+            {
+                "title": f"Study {i + 1} on {topics[i % len(topics)]} for language models",
+                "year": 2020 + i % 6,
+                "venue": "Synthetic Conference",
+                "citationCount": (i * 37) % 500,
+                "abstract": (
+                    f"We study {topics[i % len(topics)]} for language models. "
+                    f"Our method variant {i % 7} improves benchmark {i % 5} by {i % 9 + 1} points "
+                    "over strong baselines, while noting limits on small datasets. " * 3
+                ),
+            },
+        )
+        for i in range(size)
+    ]
+
+
+async def _live(size: int, args: argparse.Namespace) -> tuple[float, float, float, int, int]:
+    sources = _synthetic_papers(size)
+    start = time.perf_counter()
+    await tools._generate("literature_synthesizer", "Papers:\n\n" + "\n\n".join(sources))
+    single = time.perf_counter() - start
+    rows: list[str] = []
+
+    async def summarize(batch: list[str]) -> str:
+        text = await tools._generate("synthesis_map", "Papers:\n\n" + "\n\n".join(batch))
+        batch_rows, partial = tools._split_rows(text)
+        rows.extend(batch_rows)
+        return partial
+
+    async def merge(partials: list[str]) -> str:
+        numbered = "\n\n".join(f"Partial synthesis {i}:\n\n{p}" for i, p in enumerate(partials, 1))
+        return await tools._generate("synthesis_reduce", numbered)
+
+    start = time.perf_counter()
+    result = await tools.map_reduce(
+        tools.split_batches(sources, args.batch_size),
+        summarize,
+        merge,
+        fanout=args.fanout,
+        concurrency=args.concurrency,
+    )
+    ordered = tools._order_rows(rows)
+    tool_result = {
+        "synthesis": result.output,
+        "comparison_table": tools.comparison_table(ordered, tools._RETURNED_TABLE_ROWS),
+        "comparison_rows": len(ordered),
+    }
+    final_start = time.perf_counter()
+    await tools._generate(
+        "literature_synthesizer",
+        "synthesize_in_batches returned:\n\n" + json.dumps(tool_result, ensure_ascii=False),
+    )
+    end = time.perf_counter()
+    return single, end - start, end - final_start, result.calls + 1, result.levels
+
+
+async def _main(args: argparse.Namespace) -> None:
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    mode = "live models" if args.live else "simulated latency"
+    print(
+        f"Synthesis benchmark ({mode}): batch={args.batch_size}, fanout={args.fanout}, "
+        f"concurrency={args.concurrency}"
+    )
+    print(
+        f"{'papers':>7} {'single_s':>9} {'map_reduce_s':>13} {'final_s':>8} {'speedup':>8} "
+        f"{'calls':>6} {'levels':>7}"
+    )
+    for size in sizes:
+        run = _live if args.live else _simulated
+        single, map_reduce, final, calls, levels = await run(size, args)
+        print(
+            f"{size:>7} {single:>9.1f} {map_reduce:>13.1f} {final:>8.1f} "
+            f"{single / map_reduce:>7.1f}x {calls:>6} {levels:>7}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,25,50,80,100,200,400")
+    parser.add_argument("--batch-size", type=int, default=tools._BATCH_SIZE)
+    parser.add_argument("--fanout", type=int, default=tools._MERGE_FANOUT)
+    parser.add_argument("--concurrency", type=int, default=tools._CONCURRENCY)
+    parser.add_argument("--live", action="store_true", help="Call the real models.")
+    parser.add_argument("--overhead", type=float, default=0.8, help="Simulated s per call.")
+    parser.add_argument("--prefill-rate", type=float, default=10000, help="Input tokens/s.")
+    parser.add_argument("--decode-rate", type=float, default=150, help="Output tokens/s.")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Sleep scale factor.")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
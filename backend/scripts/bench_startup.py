@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark backend cold start: import profile, time to /health and to first run.
+
+For each STARTUP_MODE, starts a fresh uvicorn process and measures:
+  - time until GET /health (liveness) and GET /ready (warm-up done) return 200
+  - (with --run) time until the first AG-UI run streams RUN_FINISHED
+
+Also prints the slowest imports of main.py using ``python -X importtime``.
+
+Usage:
+    uv run python scripts/bench_startup.py [--modes eager,lazy] [--repeat 3] [--run]
+
+--run sends a real prompt to the model, so GOOGLE_API_KEY must be set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+
+def _backend_dir() -> Path:
+    return Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_profile(top: int = 15) -> list[tuple[float, float, str]]:
+    """Return (cumulative_s, self_s, module) for the slowest imports of main.py."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=_backend_dir(),
+        env={**os.environ, "STARTUP_MODE": "eager"},
+    )
+    rows: list[tuple[float, float, str]] = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cum_us, module = parts
+        rows.append((int(cum_us) / 1e6, int(self_us) / 1e6, module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def _wait_for(path: str, port: int, proc: subprocess.Popen, start: float, timeout: float) -> float:
+    """Poll GET path until it returns 200; return seconds since start."""
+    url = f"http://127.0.0.1:{port}{path}"
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            with urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter() - start
+        except (URLError, ConnectionError, OSError):
+            time.sleep(0.02)
+    raise TimeoutError(f"{path} not ready after {timeout}s")
+
+
+def _first_run(port: int, prompt: str, timeout: float) -> float:
+    body = {
+        "threadId": str(uuid.uuid4()),
+        "runId": str(uuid.uuid4()),
+        "state": {},
+        "messages": [{"id": str(uuid.uuid4()), "role": "user", "content": prompt}],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+    req = Request(
+        f"http://127.0.0.1:{port}/",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+    )
+    start = time.perf_counter()
+    with urlopen(req, timeout=timeout) as resp:
+        for raw in resp:
+            line = raw.decode("utf-8", errors="replace")
+            if '"RUN_FINISHED"' in line:
+                return time.perf_counter() - start
+            if '"RUN_ERROR"' in line:
+                raise RuntimeError(f"run failed: {line.strip()}")
+    raise RuntimeError("stream ended without RUN_FINISHED")
+
+
+def bench_mode(mode: str, *, run: bool, prompt: str, timeout: float) -> dict[str, float]:
+    """Start one server process in the given mode and time its readiness milestones."""
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=_backend_dir(),
+        env={**os.environ, "STARTUP_MODE": mode},
+    )
+    try:
+        result = {
+            "health_s": _wait_for("/health", port, proc, t0, timeout),
+            "ready_s": _wait_for("/ready", port, proc, t0, timeout),
+        }
+        if run:
+            run_s = _first_run(port, prompt, timeout)
+            result["first_run_s"] = time.perf_counter() - t0
+            result["first_run_latency_s"] = run_s
+        return result
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark backend cold start")
+    parser.add_argument("--modes", default="eager,lazy", help="Comma-separated STARTUP_MODE values")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per mode")
+    parser.add_argument("--run", action="store_true", help="Also time the first completed run")
+    parser.add_argument("--prompt", default="Who are you? Answer in one sentence.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--top-imports", type=int, default=15)
+    args = parser.parse_args()
+
+    if args.top_imports > 0:
+        print(f"Slowest imports of main.py (top {args.top_imports}, cumulative):")
+        for cum, self_s, module in import_profile(args.top_imports):
+            print(f"  {cum:8.3f}s  (self {self_s:6.3f}s)  {module}")
+        print()
+
+    for mode in args.modes.split(","):
+        samples = [
+            bench_mode(mode, run=args.run, prompt=args.prompt, timeout=args.timeout)
+            for _ in range(args.repeat)
+        ]
+        for key in samples[0]:
+            values = [s[key] for s in samples]
+            print(
+                f"{mode:>6}  {key:<20} median {statistics.median(values):7.3f}s  "
+                f"min {min(values):7.3f}s  max {max(values):7.3f}s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for run deadlines and cancellation on client disconnect."""
+
+import asyncio
+import time
+
+import pytest
+from ag_ui.core import EventType, RunAgentInput, UserMessage
+from google.adk import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from academic_research.util import cancellation
+from academic_research.util.agui import ResearchADKAgent
+from academic_research.util.cancellation import DisconnectWatcher, RunBudget, RunCancelled
+
+
+def test_budget_shrinks_timeouts_and_wakes_sleepers():
+    budget = RunBudget(seconds=5)
+    assert 4 < budget.timeout(30) <= 5
+    assert budget.timeout(2) == 2
+
+    with cancellation.run_budget(budget):
+        assert cancellation.tool_timeout(30) <= 5
+        budget.cancel("client disconnected")
+        start = time.monotonic()
+        with pytest.raises(RunCancelled, match="client disconnected"):
+            cancellation.sleep(10)
+        assert time.monotonic() - start < 1
+    assert cancellation.tool_timeout(30) == 30
+
+
+@pytest.mark.asyncio
+async def test_disconnect_watcher_exposes_disconnect():
+    seen = []
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "http.request"
+        disconnected = cancellation.client_disconnected()
+        await asyncio.wait_for(disconnected.wait(), 1)
+        seen.append("disconnected")
+
+    messages = [{"type": "http.request", "body": b"{}", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+
+    await DisconnectWatcher(app)({"type": "http"}, receive, None)
+    assert seen == ["disconnected"]
+
+
+class _CallToolModel(BaseLlm):
+    model: str = "fake"
+
+    async def generate_content_async(self, llm_request, stream=False):
+        call = types.FunctionCall(name="slow_search", args={})
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(function_call=call)])
+        )
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_run_and_tools(monkeypatch):
+    tool_state = {}
+
+    async def slow_search() -> str:
+        """Searches for a long time."""
+        tool_state["started"] = True
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            tool_state["cancelled"] = True
+            raise
+        return "done"
+
+    agent = ResearchADKAgent(
+        adk_agent=Agent(name="root", model=_CallToolModel(), tools=[slow_search]),
+        app_name="test_cancel",
+        user_id="u",
+        use_in_memory_services=True,
+    )
+    # What DisconnectWatcher provides for a real request.
+    disconnected = asyncio.Event()
+    monkeypatch.setattr("academic_research.util.agui.client_disconnected", lambda: disconnected)
+    run_input = RunAgentInput(
+        thread_id="thread",
+        run_id="run",
+        state={},
+        messages=[UserMessage(id="m1", role="user", content="find papers")],
+        tools=[],
+        context=[],
+        forwarded_props={},
+    )
+
+    async def disconnect_when_tool_starts():
+        while "started" not in tool_state:
+            await asyncio.sleep(0.01)
+        disconnected.set()
+
+    trigger = asyncio.create_task(disconnect_when_tool_starts())
+    start = time.monotonic()
+    events = [e async for e in agent.run(run_input)]
+    await trigger
+    await asyncio.sleep(0.1)
+
+    assert time.monotonic() - start < 10
+    assert events[0].type == EventType.RUN_STARTED
+    assert EventType.RUN_FINISHED not in [e.type for e in events]
+    assert tool_state.get("cancelled")
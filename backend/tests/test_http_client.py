@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the keep-alive connection pool (against a local HTTP/1.1 server) and rate limiter."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+from academic_research.sub_agents.paper_search.tools import s2_rate_limiter
+from academic_research.util.cancellation import RunBudget, RunCancelled, run_budget
+from academic_research.util.http_client import ConnectionPool, RateLimiter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 404 if self.path.startswith("/missing") else 200
+        body = f"path={self.path}".encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(server_url):
+    pool = ConnectionPool()
+    pool.warm(server_url)
+    first = pool.request("GET", f"{server_url}/a?q=1")
+    second = pool.request("GET", f"{server_url}/b")
+
+    assert first.text() == "path=/a?q=1"
+    assert second.text() == "path=/b"
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+
+
+def test_error_status_raises_http_error(server_url):
+    pool = ConnectionPool()
+    with pytest.raises(HTTPError) as exc_info:
+        pool.request("GET", f"{server_url}/missing")
+    assert exc_info.value.code == 404
+
+
+def test_expired_idle_connection_is_not_reused(server_url):
+    pool = ConnectionPool(idle_timeout=0.0)
+    pool.request("GET", f"{server_url}/a")
+    pool.request("GET", f"{server_url}/b")
+    assert pool.stats()["created"] == 2
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=20.0)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    # First token is immediate (burst of 1), the remaining three wait 50 ms each.
+    assert time.monotonic() - start >= 0.14
+
+
+def test_rate_limiter_wait_ends_when_run_is_cancelled():
+    limiter = RateLimiter(rate=0.5)
+    limiter.acquire()
+    budget = RunBudget()
+    threading.Timer(0.1, budget.cancel).start()
+    start = time.monotonic()
+    with run_budget(budget), pytest.raises(RunCancelled):
+        limiter.acquire()
+    assert time.monotonic() - start < 1
+
+
+def test_semantic_scholar_limit_needs_an_api_key(monkeypatch):
+    monkeypatch.delenv("SEMANTIC_SCHOLAR_MAX_RPS", raising=False)
+    monkeypatch.delenv("SEMANTIC_SCHOLAR_API_KEY", raising=False)
+    s2_rate_limiter.cache_clear()
+    assert s2_rate_limiter().rate == 0
+    monkeypatch.setenv("SEMANTIC_SCHOLAR_API_KEY", "key")
+    s2_rate_limiter.cache_clear()
+    assert s2_rate_limiter().rate == 1
+    s2_rate_limiter.cache_clear()
@@ -0,0 +1,120 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for per-agent model routing and timeout fallback."""
+
+import asyncio
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from academic_research.util import cancellation, models
+from academic_research.util.cancellation import RunBudget, RunCancelled, run_budget
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class _FakeModel:
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.name)]))
+
+
+def _request(text: str) -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = models.ModelRouter(models.AGENT_MODELS)
+    monkeypatch.setattr(models, "model_router", router)
+    return router
+
+
+def test_synthesis_escalates_on_long_input(router):
+    short = router.route("literature_synthesizer", _request("hi"))
+    long = router.route("literature_synthesizer", _request("x" * 4 * 40000))
+
+    assert short.tier == "standard"
+    assert long.tier == "heavy"
+    assert router.route("coordinator", _request("x" * 4 * 40000)).tier == "light"
+
+
+def test_degraded_model_steps_down_a_tier(router):
+    standard = models._TIER_MODELS["standard"]
+    for _ in range(5):
+        router.record(standard, 1.0, ok=False)
+
+    decision = router.route("paper_critic", _request("hi"))
+
+    assert decision.tier == "light"
+    assert any(r.startswith("degraded") for r in decision.reasons)
+
+
+def test_pinned_model_skips_routing(router, monkeypatch):
+    monkeypatch.setenv("MODEL_COORDINATOR", "gemini-custom")
+    decision = router.route("coordinator", _request("hi"))
+    assert decision.model == "gemini-custom"
+    assert decision.reasons == ["pinned"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back_and_is_recorded(router, monkeypatch):
+    light = models._TIER_MODELS["light"]
+    standard = models._TIER_MODELS["standard"]
+    fakes = {light: _FakeModel(light, delay=1.0), standard: _FakeModel(standard)}
+    monkeypatch.setattr(models, "get_model", fakes.__getitem__)
+    monkeypatch.setitem(
+        models.AGENT_MODELS, "coordinator", models.AgentModelConfig("routing", "light", "standard", 0.05)
+    )
+    llm = models.RoutedModel(model=light, agent="coordinator")
+
+    responses = [r async for r in llm.generate_content_async(_request("hi"))]
+
+    assert [r.content.parts[0].text for r in responses] == [standard]
+    decision = router.report()["decisions"][-1]
+    assert decision["fell_back"] is True
+    assert decision["used_model"] == standard
+    assert router.report()["models"][light]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_deadline_is_not_recorded_as_model_error(router, monkeypatch):
+    light = models._TIER_MODELS["light"]
+    standard = models._TIER_MODELS["standard"]
+    fakes = {light: _FakeModel(light, delay=3.0), standard: _FakeModel(standard)}
+    monkeypatch.setattr(models, "get_model", fakes.__getitem__)
+    monkeypatch.setattr(cancellation, "_MIN_TIMEOUT_SECONDS", 0.05)
+    llm = models.RoutedModel(model=light, agent="coordinator")
+
+    with run_budget(RunBudget(0.1)), pytest.raises(RunCancelled):
+        [r async for r in llm.generate_content_async(_request("hi"))]
+    cancelled = RunBudget()
+    cancelled.cancel()
+    with run_budget(cancelled), pytest.raises(RunCancelled):
+        [r async for r in llm.generate_content_async(_request("hi"))]
+
+    report = router.report()
+    assert [d["outcome"] for d in report["decisions"][-2:]] == ["cancelled", "cancelled"]
+    assert not any(d["fell_back"] for d in report["decisions"][-2:])
+    assert report["models"] == {}
+    assert fakes[standard].calls == 0
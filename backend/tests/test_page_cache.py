@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the page cache and speculative prefetch of search hits."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from academic_research.util.page_cache import PageCache, Prefetcher
+
+
+class _SlowFetch:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, url, timeout):
+        self.calls.append(url)
+        if self.delay:
+            time.sleep(self.delay)
+        return f"text of {url}"
+
+
+def test_cache_hits_and_eviction():
+    fetch = _SlowFetch()
+    cache = PageCache(max_bytes=40)
+    assert cache.get("http://a/1", fetch, 5) == "text of http://a/1"
+    assert cache.get("http://a/1", fetch, 5) == "text of http://a/1"
+    assert fetch.calls == ["http://a/1"]
+
+    cache.get("http://a/2", fetch, 5)  # 2 x 18 bytes fit the budget
+    cache.get("http://a/3", fetch, 5)  # evicts the least recently used page
+    cache.get("http://a/1", fetch, 5)
+    assert fetch.calls == ["http://a/1", "http://a/2", "http://a/3", "http://a/1"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["pages"]) == (1, 4, 2)
+    assert stats["bytes"] <= 40
+
+
+def test_reads_join_prefetch_in_flight_and_count_use():
+    fetch = _SlowFetch(delay=0.3)
+    cache = PageCache()
+    prefetch = threading.Thread(target=cache.prefetch, args=("http://a/1", fetch))
+    prefetch.start()
+    time.sleep(0.05)
+    assert cache.get("http://a/1", fetch, 5) == "text of http://a/1"
+    prefetch.join()
+    cache.prefetch("http://a/2", fetch)
+    cache.get("http://a/2", fetch, 5)
+    cache.prefetch("http://a/3", fetch)
+
+    assert fetch.calls == ["http://a/1", "http://a/2", "http://a/3"]
+    stats = cache.stats()
+    assert stats["inflight_joins"] == 1
+    assert stats["hits"] == 1
+    assert stats["prefetched"] == 3
+    assert stats["prefetch_used"] == 2
+    assert stats["hit_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_caps_top_k_and_cancels_with_session():
+    fetch = _SlowFetch(delay=0.2)
+    cache = PageCache()
+    prefetcher = Prefetcher(cache, fetch, top_k=3, concurrency=1)
+    urls = ["http://a/1", None, "ftp://a/x", "http://a/1", "http://a/2", "http://a/3", "http://a/4"]
+    assert prefetcher.schedule("conv", urls) == 3
+    await asyncio.sleep(0.05)
+    # With one prefetch at a time the other two are still queued.
+    prefetcher.cancel("conv")
+    await asyncio.sleep(0.3)
+
+    assert fetch.calls == ["http://a/1"]
+    assert cache.get("http://a/1", fetch, 5) == "text of http://a/1"
+    assert prefetcher.stats()["cancelled"] == 3
+    assert prefetcher.stats()["pending"] == 0
+
+
+class _YieldingLock:
+    """Lock that sleeps after each release, widening any check-then-act window."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("prefetch_first", [False, True])
+def test_concurrent_reads_of_a_missing_page_share_one_fetch(prefetch_first):
+    fetch = _SlowFetch(delay=0.1)
+    cache = PageCache()
+    cache._lock = _YieldingLock()
+    start = threading.Barrier(16)
+    results = []
+
+    def read(i):
+        start.wait()
+        if prefetch_first and i % 2:
+            cache.prefetch("http://a/1", fetch)
+        else:
+            results.append(cache.get("http://a/1", fetch, 5))
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fetch.calls == ["http://a/1"]
+    assert results and set(results) == {"text of http://a/1"}
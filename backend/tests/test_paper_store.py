@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the per-session paper store and reference-only session state."""
+
+import json
+
+import pytest
+
+from academic_research.sub_agents.paper_search import tools
+from academic_research.util.paper_store import (
+    PAPER_STORE_STATE_KEY,
+    RECENT_PAPERS_STATE_KEY,
+    PaperStore,
+    PaperStoreRegistry,
+    remember_papers,
+    summarize_paper,
+)
+
+
+class _Ctx:
+    def __init__(self, state=None):
+        self.state = state if state is not None else {}
+
+
+def _paper(paper_id, **extra):
+    return {"paperId": paper_id, "title": f"Paper {paper_id}", "year": 2025, **extra}
+
+
+def test_store_deduplicates_and_merges():
+    store = PaperStore(max_papers=2)
+    store.add([_paper("a"), _paper("b")])
+    store.add([_paper("a", abstract="full text"), _paper("c")])
+
+    assert len(store) == 2
+    assert "b" not in store  # least recently added/updated is evicted
+    assert store.get("a")["abstract"] == "full text"
+
+
+def test_registry_is_bounded():
+    registry = PaperStoreRegistry(max_stores=2)
+    first = registry.get("s1")
+    registry.get("s2")
+    registry.get("s1")
+    registry.get("s3")
+
+    assert registry.get("s1") is first
+    assert registry.stats()["stores"] == 2
+
+
+def test_state_holds_only_compact_references():
+    ctx = _Ctx()
+    remember_papers(ctx, [_paper("a", abstract="x" * 5000), _paper("b")])
+    remember_papers(ctx, [_paper("b"), _paper("c")])
+
+    refs = ctx.state[RECENT_PAPERS_STATE_KEY]
+    assert [r["paperId"] for r in refs] == ["b", "c", "a"]
+    assert all(set(r) == {"paperId", "title", "year"} for r in refs)
+    assert ctx.state[PAPER_STORE_STATE_KEY]
+
+
+def test_summary_truncates_abstract_and_authors():
+    summary = summarize_paper(
+        _paper(
+            "a",
+            abstract="word " * 200,
+            authors=[{"authorId": str(i), "name": f"Author {i}"} for i in range(5)],
+            openAccessPdf={"url": "https://example.org/a.pdf", "status": "GREEN"},
+        )
+    )
+    assert len(summary["abstract"]) <= 303
+    assert summary["authors"] == ["Author 0", "Author 1", "Author 2", "et al."]
+    assert summary["openAccessPdf"] == "https://example.org/a.pdf"
+
+
+class _FakeS2:
+    """Stands in for tools._s2_request: a tiny citation graph a <- b <- c, a -> r."""
+
+    def __init__(self):
+        counts = {"a": 9, "b": 5, "c": 1, "r": 7}
+        self.papers = {pid: _paper(pid, citationCount=n) for pid, n in counts.items()}
+        self.citations = {"a": ["b"], "b": ["c"], "c": [], "r": ["a"]}
+        self.calls = []
+
+    def __call__(self, method, url, *, body=None, timeout=30):
+        self.calls.append((method, url, body))
+        if "/paper/batch" in url:
+            return [self.papers.get(pid) for pid in body["ids"]]
+        paper_id = url.split("/paper/")[1].split("/")[0]
+        if "/citations?" in url:
+            return {"data": [{"citingPaper": self.papers[p]} for p in self.citations[paper_id]]}
+        refs = [p for p, citing in self.citations.items() if paper_id in citing]
+        return {"data": [{"citedPaper": self.papers[p]} for p in refs]}
+
+
+@pytest.mark.asyncio
+async def test_get_paper_details_batches_unknown_ids(monkeypatch):
+    fake = _FakeS2()
+    monkeypatch.setattr(tools, "_s2_request", fake)
+    ctx = _Ctx()
+    remember_papers(ctx, [_paper("a", abstract="full abstract", venue="NeurIPS")])
+
+    result = json.loads(
+        await tools.get_paper_details(["a", "b", "zzz", "a"], "title,abstract", tool_context=ctx)
+    )
+
+    assert [p["paperId"] for p in result["papers"]] == ["a", "b"]
+    assert result["papers"][0] == {"paperId": "a", "title": "Paper a", "abstract": "full abstract"}
+    assert result["missing"] == ["zzz"]
+    # "a" was answered from the store; "b" and "zzz" went out in one batch request.
+    assert [c[2] for c in fake.calls] == [{"ids": ["b", "zzz"]}]
+
+
+@pytest.mark.asyncio
+async def test_expand_citation_graph_deduplicates_levels(monkeypatch):
+    monkeypatch.setattr(tools, "_s2_request", _FakeS2())
+    ctx = _Ctx()
+
+    result = json.loads(await tools.expand_citation_graph(["a"], depth=2, tool_context=ctx))
+
+    assert [p["paperId"] for p in result["seeds"]] == ["a"]
+    assert [sorted(p["paperId"] for p in lvl["papers"]) for lvl in result["levels"]] == [
+        ["b", "r"],
+        ["c"],
+    ]
+    assert result["edges"] == [["a", "r"], ["b", "a"], ["c", "b"]]
+    assert not result["truncated"]
+    assert "c" in tools.paper_stores.for_context(ctx)
@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for BM25 passage selection."""
+
+import pytest
+
+from academic_research.util.passages import bm25_scores, select_passages, split_passages
+from academic_research.util.tools import fetch_url
+
+_PREAMBLE = "Copyright notice, navigation menu and author affiliations. " * 20
+_METHODS = (
+    "Methods. We train a transformer encoder with contrastive loss on 1M image-text pairs "
+    "and evaluate retrieval recall on the MSCOCO benchmark."
+)
+_RELATED = "Related work. Earlier systems used recurrent networks for captioning. " * 10
+
+
+def _paper():
+    return "\n\n".join([_PREAMBLE] * 5 + [_RELATED, _METHODS, _RELATED] + [_PREAMBLE] * 5)
+
+
+def test_split_passages_respects_size_and_keeps_text():
+    text = _paper()
+    passages = split_passages(text, size=500)
+    assert all(len(p) <= 500 for p in passages)
+    assert "".join(passages).replace("\n", "").replace(" ", "") == (
+        text.replace("\n", "").replace(" ", "")
+    )
+
+
+def test_bm25_prefers_passages_with_rare_query_terms():
+    scores = bm25_scores(["contrastive loss on pairs", "the loss", "unrelated text"], "contrastive loss")
+    assert scores[0] > scores[1] > scores[2] == 0
+
+
+def test_select_passages_returns_relevant_part_within_budget():
+    text = _paper()
+    selected = select_passages(text, "What loss and benchmark are used for evaluation?", 1500)
+    assert _METHODS in selected
+    assert "Copyright notice" not in selected
+    assert len(selected) < 1600
+    assert selected.startswith("[1 of ")
+
+    assert select_passages("short page", "anything", 1500) == "short page"
+    assert select_passages(text, "quantum chromodynamics", 200).startswith("Copyright notice")
+
+
+
+@pytest.mark.asyncio
+async def test_non_positive_budgets_do_not_hang():
+    text = "hello world. foo bar."
+    assert select_passages(text, "hello", 0) == ""
+    assert select_passages(text, "hello", -1) == ""
+    assert all(len(p) == 1 for p in split_passages(text, size=0))
+    result = await fetch_url("http://127.0.0.1:9/", "hello", max_chars=0)
+    assert result.startswith("Error: max_chars")
+    result = await fetch_url("http://127.0.0.1:9/", "hello", max_chars=-1)
+    assert result.startswith("Error: max_chars")
@@ -0,0 +1,67 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for tool progress reporting and its merge into the AG-UI event stream."""
+
+import asyncio
+
+import pytest
+from ag_ui.core import EventType, RunFinishedEvent, RunStartedEvent
+
+from academic_research.util.agui import merge_progress
+from academic_research.util.progress import PROGRESS_EVENT_NAME, ProgressReporter
+
+
+async def _tool():
+    progress = ProgressReporter("slow_tool")
+
+    def work():
+        progress("half way", finished=1)
+        progress("dropped by rate limit")
+        progress("complete", done=True, finished=2)
+
+    await asyncio.to_thread(work)
+
+
+async def _run():
+    ProgressReporter("early")("before the run starts")
+    await asyncio.sleep(0)
+    yield RunStartedEvent(type=EventType.RUN_STARTED, thread_id="t", run_id="r")
+    # Like ADK, run the tool in a separate task.
+    await asyncio.create_task(_tool())
+    yield RunFinishedEvent(type=EventType.RUN_FINISHED, thread_id="t", run_id="r")
+
+
+@pytest.mark.asyncio
+async def test_progress_is_streamed_inside_the_run():
+    events = [e async for e in merge_progress(_run)]
+
+    assert [e.type for e in events] == [
+        EventType.RUN_STARTED,
+        EventType.CUSTOM,
+        EventType.CUSTOM,
+        EventType.RUN_FINISHED,
+    ]
+    assert {e.name for e in events[1:3]} == {PROGRESS_EVENT_NAME}
+    assert [e.value["message"] for e in events[1:3]] == ["half way", "complete"]
+    assert events[2].value == {
+        "tool": "slow_tool",
+        "message": "complete",
+        "done": True,
+        "finished": 2,
+    }
+
+
+def test_reporter_without_sink_is_a_no_op():
+    ProgressReporter("tool")("nobody listens", done=True)
@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the byte-budgeted session service with spill-to-disk."""
+
+import asyncio
+import os
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from academic_research.util.session_store import BoundedSessionService
+
+
+def _event(text):
+    return Event(
+        author="agent",
+        invocation_id="inv",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta={"last": text[:10]}),
+    )
+
+
+async def _session_with_events(service, session_id, size):
+    session = await service.create_session(
+        app_name="app", user_id="u", session_id=session_id, state={"thread": session_id}
+    )
+    await service.append_event(session, _event("x" * size))
+    return session
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_spill_and_restore(tmp_path):
+    service = BoundedSessionService(max_bytes=25_000, idle_seconds=0, spill_dir=str(tmp_path))
+    first = await _session_with_events(service, "s1", 10_000)
+    await _session_with_events(service, "s2", 10_000)
+    await _session_with_events(service, "s3", 10_000)
+
+    stats = service.stats()
+    assert stats["spilled_sessions"] == 1
+    assert stats["resident_bytes"] <= 25_000
+    assert len(os.listdir(tmp_path / "bounded_sessions")) == 1
+
+    # Plain reads are answered from the stub; reads with a config load events from disk.
+    stub = await service.get_session(app_name="app", user_id="u", session_id="s1")
+    assert stub.events == []
+    assert stub.state["last"] == "x" * 10
+    loaded = await service.get_session(
+        app_name="app", user_id="u", session_id="s1", config=GetSessionConfig()
+    )
+    assert loaded.events[0].content.parts[0].text == "x" * 10_000
+    stats = service.stats()
+    assert (stats["stub_reads"], stats["disk_reads"], stats["spilled_sessions"]) == (1, 1, 1)
+
+    # list_sessions still finds spilled sessions (AG-UI looks threads up by state).
+    listed = await service.list_sessions(app_name="app", user_id="u")
+    assert {s.id for s in listed.sessions} == {"s1", "s2", "s3"}
+
+    # Appending restores it (and spills the now least recently used session); a
+    # run holding the stub sees the full history, as it would after get_session.
+    await service.append_event(stub, _event("more"))
+    assert service.stats()["restores"] == 1
+    assert len(stub.events) == 2
+    restored = await service.get_session(app_name="app", user_id="u", session_id="s1")
+    assert len(restored.events) == 2
+    assert first.id == restored.id
+
+
+@pytest.mark.asyncio
+async def test_expiry_sweep_does_not_keep_idle_sessions_resident(tmp_path):
+    service = BoundedSessionService(max_bytes=25_000, idle_seconds=0.05, spill_dir=str(tmp_path))
+    await _session_with_events(service, "s1", 10_000)
+    await _session_with_events(service, "s2", 10_000)
+    await asyncio.sleep(0.1)
+    await _session_with_events(service, "s3", 1)
+    disk_reads = service.stats()["disk_reads"]
+
+    # Like AG-UI's cleanup loop: read every tracked session, then a new one arrives.
+    for session_id in ("s1", "s2", "s3"):
+        session = await service.get_session(app_name="app", user_id="u", session_id=session_id)
+        assert session.last_update_time > 0
+    await _session_with_events(service, "s4", 10_000)
+
+    stats = service.stats()
+    assert stats["spilled_sessions"] == 1
+    assert stats["resident_bytes"] <= 25_000
+    assert stats["disk_reads"] == disk_reads
+
+
+@pytest.mark.asyncio
+async def test_active_sessions_are_not_spilled(tmp_path):
+    service = BoundedSessionService(max_bytes=1_000, idle_seconds=60, spill_dir=str(tmp_path))
+    await _session_with_events(service, "s1", 5_000)
+    await _session_with_events(service, "s2", 5_000)
+
+    assert service.stats()["spilled_sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_spill_file(tmp_path):
+    service = BoundedSessionService(max_bytes=1, idle_seconds=0, spill_dir=str(tmp_path))
+    await _session_with_events(service, "s1", 100)
+    await _session_with_events(service, "s2", 100)
+    assert os.listdir(tmp_path / "bounded_sessions")
+
+    await service.delete_session(app_name="app", user_id="u", session_id="s1")
+    await service.delete_session(app_name="app", user_id="u", session_id="s2")
+
+    assert os.listdir(tmp_path / "bounded_sessions") == []
+    assert await service.get_session(app_name="app", user_id="u", session_id="s1") is None
+
+
+def test_startup_removes_only_own_spill_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep")
+    own = tmp_path / "bounded_sessions"
+    own.mkdir()
+    (own / f"{'a' * 64}.json").write_text("{}")
+    (own / "other.json").write_text("keep")
+
+    BoundedSessionService(spill_dir=str(tmp_path))
+
+    assert (tmp_path / "notes.txt").read_text() == "keep"
+    assert sorted(os.listdir(own)) == ["other.json"]
@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for startup profiling and lazy sub-agent construction."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from academic_research.util.startup import StartupProfiler
+
+
+def test_profiler_records_phases_and_first_milestone():
+    profiler = StartupProfiler()
+    with profiler.phase("load"):
+        pass
+    with pytest.raises(RuntimeError), profiler.phase("broken"):
+        raise RuntimeError("boom")
+    profiler.mark("ready")
+    first = profiler.report()["milestones"]["ready"]
+    profiler.mark("ready")
+
+    report = profiler.report()
+    assert [p["name"] for p in report["phases"]] == ["load", "broken"]
+    assert report["phases"][1]["error"] == "RuntimeError: boom"
+    assert report["milestones"]["ready"] == first
+
+
+def test_importing_tools_does_not_import_adk():
+    """trend_survey imports paper_search.tools; that must not build the agent."""
+    code = (
+        "import sys\n"
+        "import academic_research.sub_agents.paper_search.tools\n"
+        "assert 'google.adk' not in sys.modules, 'google.adk imported eagerly'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_app_shares_in_flight_build():
+    """A caller that times out must not leave the next one to start a second build."""
+    code = (
+        "import asyncio, time\n"
+        "import main\n"
+        "builds = []\n"
+        "def slow_build():\n"
+        "    builds.append(1)\n"
+        "    time.sleep(0.3)\n"
+        "    return 'app'\n"
+        "main.build_agui_app = slow_build\n"
+        "async def check():\n"
+        "    lazy = main.LazyAGUIApp()\n"
+        "    try:\n"
+        "        await asyncio.wait_for(lazy.get_app(), 0.05)\n"
+        "    except asyncio.TimeoutError:\n"
+        "        pass\n"
+        "    assert await lazy.get_app() == 'app'\n"
+        "    assert builds == [1], builds\n"
+        "asyncio.run(check())\n"
+    )
+    env = {**os.environ, "STARTUP_MODE": "lazy", "WARMUP_STEPS": ""}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
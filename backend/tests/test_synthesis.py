@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for map-reduce synthesis over large paper sets."""
+
+import asyncio
+import json
+
+import pytest
+
+from academic_research.sub_agents.literature_synthesizer import tools
+from academic_research.util.paper_store import remember_papers
+from academic_research.util.progress import progress_sink
+
+
+class _Ctx:
+    def __init__(self):
+        self.state = {}
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_merges_hierarchically_within_concurrency():
+    active = peak = 0
+
+    async def call(result):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return result
+
+    async def map_fn(item):
+        if item == 7:
+            raise ValueError("model error")
+        return await call(str(item))
+
+    async def reduce_fn(parts):
+        return await call("+".join(parts))
+
+    result = await tools.map_reduce(list(range(17)), map_fn, reduce_fn, fanout=4, concurrency=3)
+
+    # 16 partials -> 4 -> 1.
+    assert result.levels == 2
+    assert sorted(result.output.replace("+", " ").split(), key=int) == [
+        str(i) for i in range(17) if i != 7
+    ]
+    assert result.calls == 17 + 4 + 1
+    assert result.errors == ["batch 8: ValueError: model error"]
+    assert peak == 3
+
+
+def test_split_batches_is_even_and_contiguous():
+    assert [len(b) for b in tools.split_batches(list(range(17)), 8)] == [6, 6, 5]
+    assert tools.split_batches([], 8) == []
+
+
+@pytest.mark.asyncio
+async def test_synthesize_in_batches_collects_rows_and_merges(monkeypatch):
+    ctx = _Ctx()
+    papers = [
+        {"paperId": f"p{i}", "title": f"Paper {i}", "abstract": f"Finding {i}.", "year": 2024}
+        for i in range(25)
+    ]
+    remember_papers(ctx, papers)
+    prompts = []
+
+    async def fake_generate(agent, prompt):
+        prompts.append((agent, prompt))
+        if agent == "synthesis_map":
+            sources = [line.split(" (")[0] for line in prompt.splitlines() if line.startswith("[")]
+            # Rows written in reverse, one with a reworded title: order comes from the numbers.
+            rows = "\n".join(
+                f"| {s.replace('Paper', 'The paper')} | 2024 | m | d | f | l |"
+                for s in reversed(sources)
+            )
+            return (
+                f"## Thematic Clusters\n- {len(sources)} papers\n## Comparison Rows\n"
+                f"{tools._TABLE_HEADER}\n{rows}"
+            )
+        return "## Thematic Clusters\n- merged"
+
+    monkeypatch.setattr(tools, "_generate", fake_generate)
+    reports = []
+    with progress_sink(reports.append):
+        result = json.loads(
+            await tools.synthesize_in_batches([], focus="testing", tool_context=ctx)
+        )
+
+    assert result["papers"] == 25
+    assert result["batches"] == 4
+    assert result["merge_levels"] == 1
+    assert result["synthesis"] == "## Thematic Clusters\n- merged"
+    # Only the first rows go back to the agent; the client gets the full table
+    # in the final progress event, and nothing is added to session state.
+    assert result["comparison_rows"] == 25
+    assert len(result["comparison_table"].splitlines()[2:]) == tools._RETURNED_TABLE_ROWS
+    assert reports[-1]["done"]
+    rows = reports[-1]["comparison_table"].splitlines()[2:]
+    assert len(rows) == 25
+    # Most recently stored first, whatever order the batches finished in.
+    assert [r.split(" |")[0] for r in rows[:2]] == ["| The paper 24", "| The paper 23"]
+    assert not any("table" in key for key in ctx.state)
+    assert all("Research focus: testing" in p for _, p in prompts)
+    reduce_prompts = [p for agent, p in prompts if agent == "synthesis_reduce"]
+    assert len(reduce_prompts) == 1
+    assert "Comparison Rows" not in reduce_prompts[0]
+    assert "| Paper" not in reduce_prompts[0]
+
+
+def test_rows_without_a_source_number_go_last():
+    rows = ["| Unnumbered | x |", "| [2] B | x |", "| [10] C | x |", "| [1] A | x |"]
+    assert tools._order_rows(rows) == ["| A | x |", "| B | x |", "| C | x |", "| Unnumbered | x |"]
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the URL fetch tools against a local HTTP server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from academic_research.util import tools
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(2)
+            if self.path.startswith("/missing"):
+                self.send_error(404)
+                return
+            size = int(self.path.rsplit("/", 1)[-1]) if self.path[-1].isdigit() else 100
+            time.sleep(0.1)
+            body = ("x" * size).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    _Handler.active = _Handler.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_split_budget_keeps_short_texts_whole():
+    assert tools._split_budget([10, 500, 1000], 610) == [10, 300, 300]
+    assert tools._split_budget([10, 20], 1000) == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_fetch_urls_shares_budget_and_reports_errors(server_url):
+    urls = [
+        f"{server_url}/{name}/{n}" for name, n in [("a", 50), ("b", 5000), ("c", 5000), ("d", 5000)]
+    ]
+    urls += [f"{server_url}/missing", "ftp://example.org/x"]
+
+    result = json.loads(await tools.fetch_urls(urls, max_total_chars=3050))["results"]
+
+    assert [r["url"] for r in result] == urls
+    assert result[0] == {"url": urls[0], "text": "x" * 50, "truncated": False}
+    assert [len(r["text"]) for r in result[1:4]] == [1000, 1000, 1000]
+    assert all(r["truncated"] for r in result[1:4])
+    assert "HTTP 404" in result[4]["error"]
+    assert "Only http/https" in result[5]["error"]
+    # All URLs share one host, so at most the per-host limit ran at once.
+    assert _Handler.peak <= tools._FETCH_PER_HOST_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_fetch_urls_stops_at_deadline(server_url):
+    start = time.monotonic()
+    raw = await tools.fetch_urls(
+        [f"{server_url}/page/10", f"{server_url}/slow"], deadline_seconds=1
+    )
+    result = json.loads(raw)["results"]
+
+    assert time.monotonic() - start < 1.5
+    assert result[0]["text"] == "x" * 10
+    assert "Deadline" in result[1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_urls_selects_passages_off_the_event_loop(server_url, monkeypatch):
+    threads = []
+
+    def select(text, query, max_chars):
+        threads.append(threading.current_thread())
+        return f"{len(text)} chars for {query}"
+
+    monkeypatch.setattr(tools, "select_passages", select)
+    urls = [f"{server_url}/q/10", f"{server_url}/q/20"]
+    result = json.loads(await tools.fetch_urls(urls, query="methods"))["results"]
+
+    assert [r["text"] for r in result] == ["10 chars for methods", "20 chars for methods"]
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the startup warm-up runner behind the /ready probe."""
+
+import asyncio
+
+import pytest
+
+from academic_research.util.warmup import Warmup
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _fail():
+    raise ConnectionError("unreachable")
+
+
+async def _slow():
+    await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_optional_failures_still_become_ready():
+    warmup = Warmup({"sync": lambda: "ok", "network": _fail, "slow": _slow}, step_timeout=0.05)
+    assert not warmup.ready
+
+    await warmup.run()
+
+    report = warmup.report()
+    assert warmup.ready
+    assert report["steps"]["sync"] == {
+        "required": False,
+        "status": "ok",
+        "detail": "ok",
+        "duration_s": report["steps"]["sync"]["duration_s"],
+    }
+    assert report["steps"]["network"]["error"] == "ConnectionError: unreachable"
+    assert "timed out" in report["steps"]["slow"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_required_failure_keeps_pod_unready_until_retry_succeeds():
+    ran = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("unreachable")
+
+    warmup = Warmup(
+        {"optional": _fail, "agent": flaky, "later": lambda: ran.append(1)},
+        required={"agent"},
+        retry_backoff=0.05,
+    )
+    task = asyncio.create_task(warmup.run())
+    await asyncio.sleep(0.02)
+
+    assert not warmup.ready
+    assert warmup.report()["status"] == "retrying"
+    assert ran == []
+
+    await asyncio.wait_for(task, 1)
+
+    report = warmup.report()
+    assert warmup.ready
+    assert report["attempts"] == 3
+    assert report["steps"]["agent"]["status"] == "ok"
+    # Optional steps before the failed required one are not re-run.
+    assert report["steps"]["optional"]["status"] == "error"
+    assert ran == [1]